@@ -0,0 +1,42 @@
+from django.apps import AppConfig
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save, pre_delete)
+
+
+class ApiConfig(AppConfig):
+    name = 'api'
+
+    def ready(self):
+        from reviews.models import Category, Genre, Title
+        from reviews.services import (sync_category_leaderboard,
+                                      sync_genre_leaderboard,
+                                      touch_author_content,
+                                      touch_related_titles)
+        from users.models import User
+        from .cache import bump_version_on_commit
+
+        for model in (Category, Genre):
+            post_save.connect(bump_version_on_commit, sender=model)
+            post_delete.connect(bump_version_on_commit, sender=model)
+            post_save.connect(touch_related_titles, sender=model)
+            pre_delete.connect(touch_related_titles, sender=model)
+        post_save.connect(sync_category_leaderboard, sender=Title)
+        m2m_changed.connect(sync_genre_leaderboard, sender=Title.genre.through)
+        post_save.connect(touch_author_content, sender=User)
+
+        post_migrate.connect(
+            restore_search_triggers, dispatch_uid='restore_search_triggers'
+        )
+
+
+def restore_search_triggers(using, **kwargs):
+    """
+    Возвращает триггеры поисковых индексов после migrate: SQLite теряет
+    их, когда пересоздаёт таблицу при изменении колонок.
+    """
+    from reviews.search import (FTS_TABLE, FTS_TRIGGERS,
+                                restore_fts_triggers)
+    from users.search import TRIGRAM_TABLE, TRIGRAM_TRIGGERS
+
+    restore_fts_triggers(using, FTS_TABLE, FTS_TRIGGERS)
+    restore_fts_triggers(using, TRIGRAM_TABLE, TRIGRAM_TRIGGERS)
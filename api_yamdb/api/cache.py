@@ -0,0 +1,33 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def version_key(model):
+    return f'cache-version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    """
+    Возвращает текущую версию данных модели.
+
+    Начальное значение берётся из времени, а не с единицы: если ключ
+    вытеснят из кэша, новая версия не совпадёт ни с одной из прежних.
+    """
+    return cache.get_or_set(
+        version_key(model), lambda: time.time_ns() // 1000, None
+    )
+
+
+def bump_version(model):
+    """Сдвигает версию модели, делая устаревшими все закэшированные ответы."""
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        get_version(model)
+
+
+def bump_version_on_commit(sender, **kwargs):
+    """Обработчик сигналов post_save и post_delete."""
+    transaction.on_commit(lambda: bump_version(sender))
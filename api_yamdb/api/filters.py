@@ -1,25 +1,137 @@
+from django.db.models.expressions import RawSQL
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from rest_framework.filters import (BaseFilterBackend, OrderingFilter,
+                                    SearchFilter)
+from reviews.fields import normalize
+from reviews.models import Category, Genre, Title
+from reviews.search import fts_available, search_titles
+from users.search import TRIGRAM_TABLE
+
+
+class NormalizedCharFilter(filters.CharFilter):
+    """
+    Сравнение без учёта регистра через нормализованную колонку: значение
+    приводится к нижнему регистру в Python, в SQL остаётся точное
+    равенство, которое обслуживает индекс.
+    """
+
+    def filter(self, qs, value):
+        return super().filter(qs, normalize(value))
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """
+    Список значений через запятую. Фильтры с этим классом задаются
+    через method, который сам нормализует значения.
+    """
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='iexact'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='iexact'
-    )
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='iexact'
-    )
-    year = filters.NumberFilter(
-        field_name='year',
-        lookup_expr='iexact'
-    )
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    name = NormalizedCharFilter(field_name='normalized_name')
+    year = filters.NumberFilter(field_name='year')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('category', 'genre', 'name', 'year', 'year_min', 'year_max')
+
+    def filter_category(self, queryset, name, value):
+        """
+        Категории заранее переводятся в id: при сравнении category_id
+        с константой база выбирает индекс (category_id, поле сортировки)
+        и читает первые записи страницы сразу в нужном порядке, а не
+        сортирует все произведения категории. При заданном method
+        django-filter не вызывает filter() фильтра, поэтому значения
+        приводятся к нижнему регистру здесь.
+        """
+        category_ids = list(Category.objects.filter(
+            normalized_slug__in=[normalize(item) for item in value]
+        ).values_list('pk', flat=True))
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Жанры проверяются подзапросом IN по связующей таблице: JOIN
+        размножил бы произведения с несколькими жанрами и потребовал
+        DISTINCT. Подзапрос читается по индексу (genre_id, title_id),
+        а произведения — по первичному ключу.
+        """
+        through = Title.genre.through
+        return queryset.filter(pk__in=through.objects.filter(
+            genre__in=Genre.objects.filter(
+                normalized_slug__in=[normalize(item) for item in value]
+            ).values('pk')
+        ).values('title_id'))
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по названию и описанию: ?search=."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        return search_titles(queryset, text)
+
+
+class UsernameSearchFilter(SearchFilter):
+    """
+    Поиск пользователей по логину только по индексам.
+
+    ?search=строка — подстрока без учёта регистра по триграммному
+    индексу users_user_trigram. ?search_mode=prefix — префикс с учётом
+    регистра по уникальному индексу username. Строки короче трёх
+    символов триграмм не содержат, поэтому они, как и поиск без
+    триграммного индекса, идут через icontains.
+    """
+    search_mode_param = 'search_mode'
+    trigram_table = TRIGRAM_TABLE
+    trigram_length = 3
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        mode = request.query_params.get(self.search_mode_param)
+        if mode == 'prefix':
+            return queryset.filter(
+                username__gte=text, username__lt=text + chr(0x10FFFF)
+            )
+        if len(text) < self.trigram_length or not fts_available(
+            queryset.db, self.trigram_table
+        ):
+            return queryset.filter(username__icontains=text)
+        table = self.trigram_table
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+            ('"{}"'.format(text.replace('"', '""')),)
+        ))
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter, дополняющий сортировку первичным ключом.
+
+    Ключ идёт в том же направлении, что и первое поле: тогда сортировку
+    по (поле, id) целиком обслуживает индекс без досортировки равных
+    значений. Если сортировка не задана, а поиск добавил оценку релевантности,
+    результаты упорядочиваются по ней.
+    """
+    rank_field = 'search_rank'
+
+    def get_ordering(self, request, queryset, view):
+        if (self.ordering_param not in request.query_params
+                and self.rank_field in queryset.query.annotations):
+            ordering = [self.rank_field]
+        else:
+            ordering = list(
+                super().get_ordering(request, queryset, view) or ()
+            )
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            descending = bool(ordering) and ordering[0].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
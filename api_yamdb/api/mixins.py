@@ -1,7 +1,220 @@
+import hashlib
+from calendar import timegm
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from .cache import get_version
+
 
 class ModelMixinSet(mixins.ListModelMixin, mixins.CreateModelMixin,
                     mixins.DestroyModelMixin, GenericViewSet):
     pass
+
+
+class ParentObjectMixin:
+    """
+    Загружает родительский объект вложенного маршрута один раз за запрос.
+
+    parent_lookups сопоставляет поля родителя параметрам URL,
+    parent_fields — поля, которые нужны представлению (остальные
+    откладываются). Объект запоминается на представлении, так что
+    проверка ETag, выборка дочерних объектов и запись используют
+    один и тот же запрос.
+    """
+    parent_model = None
+    parent_lookups = {}
+    parent_fields = ()
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = self.parent_model.objects.filter(**{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookups.items()
+            }).only(*self.parent_fields).first()
+        if self._parent is None:
+            raise NotFound
+        return self._parent
+
+
+class SparseFieldsetMixin:
+    """
+    Частичный ответ при чтении: ?fields= — какие поля вывести, ?omit= —
+    какие убрать (имена через запятую).
+
+    Набор полей передаётся сериализатору в контексте как fieldset.
+    only_fieldset() сужает запрос до колонок этих полей и сортировки;
+    fieldset_columns сопоставляет полю ответа поля модели, если имена
+    не совпадают. Представление со своим get_queryset() вызывает
+    only_fieldset() само и пропускает соединения и prefetch для
+    невыведенных полей, проверяя fieldset_includes().
+    """
+    fields_query_param = 'fields'
+    omit_query_param = 'omit'
+    fieldset_columns = {}
+
+    def get_fieldset(self):
+        """Множество полей ответа или None, если выводятся все."""
+        if hasattr(self, '_fieldset'):
+            return self._fieldset
+        self._fieldset = None
+        if self.request.method not in SAFE_METHODS:
+            return None
+        requested = {
+            param: {
+                name.strip()
+                for name in self.request.query_params.get(param, '').split(',')
+                if name.strip()
+            }
+            for param in (self.fields_query_param, self.omit_query_param)
+        }
+        fields, omit = requested.values()
+        if not fields and not omit:
+            return None
+        available = list(self.get_serializer_class()().fields)
+        for param, names in requested.items():
+            unknown = names - set(available)
+            if unknown:
+                raise ValidationError({param: [
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+                ]})
+        self._fieldset = frozenset(
+            name for name in available
+            if (not fields or name in fields) and name not in omit
+        )
+        return self._fieldset
+
+    def get_queryset(self):
+        return self.only_fieldset(super().get_queryset())
+
+    def fieldset_includes(self, name):
+        fieldset = self.get_fieldset()
+        return fieldset is None or name in fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
+
+    def only_fieldset(self, queryset):
+        """Загружает только колонки выводимых полей и сортировки."""
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+        columns = {queryset.model._meta.pk.name}
+        for name in fieldset:
+            columns.update(self.fieldset_columns.get(name, (name,)))
+        columns.update(self.get_sort_columns(queryset))
+        return queryset.only(*columns)
+
+    def get_sort_columns(self, queryset):
+        """Поля модели, которые курсор читает из записей страницы."""
+        ordering = getattr(self, 'keyset_ordering', ())
+        for backend in getattr(self, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(
+                    self.request, queryset, self
+                ) or ()
+        columns = {
+            field.name for field in queryset.model._meta.concrete_fields
+        }
+        return [
+            name.lstrip('-') for name in ordering
+            if name.lstrip('-') in columns
+        ]
+
+
+class CachedListMixin:
+    """
+    Кэширует ответ list до следующего изменения модели.
+
+    Ключ строится из версии модели и значимых параметров запроса, так что
+    сброс кэша — это просто смена версии. Для безопасных методов
+    аутентификация откладывается до первого обращения к request.user:
+    ответ из кэша отдаётся без разбора токена и без запросов к базе.
+    """
+    list_cache_params = (
+        'search', 'limit', 'offset', 'count', 'fields', 'omit'
+    )
+    list_cache_timeout = 60 * 60
+
+    def perform_authentication(self, request):
+        if request.method not in SAFE_METHODS:
+            super().perform_authentication(request)
+
+    def get_list_cache_key(self, request):
+        model = self.get_queryset().model
+        params = sorted(
+            (name, value.strip())
+            for name, value in request.query_params.items()
+            if name in self.list_cache_params and value.strip()
+        )
+        digest = hashlib.md5(repr(
+            (request.scheme, request.get_host(), params)
+        ).encode()).hexdigest()
+        return f'list:{model._meta.label_lower}:{get_version(model)}:{digest}'
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, self.list_cache_timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Обрабатывает If-None-Match и If-Modified-Since для list и retrieve.
+
+    Представление реализует get_validators(): пару (версия, время
+    изменения) ресурса, прочитанную без загрузки строк целиком, или None,
+    если проверка невозможна. ETag строится из версии, времени изменения,
+    пути с параметрами и формата ответа, поэтому без изменений ответ 304
+    отдаётся без сериализации. Данные связанных объектов в ответе (логины
+    авторов, названия категорий) должны сдвигать версию ресурса при
+    своём изменении — см. touch_author_content и touch_related_titles.
+    """
+
+    def get_validators(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        version, modified = validators
+        # Время изменения входит в ETag: save() в обход представлений
+        # (админка, скрипты) меняет его, но не версию.
+        digest = hashlib.md5(repr((
+            modified.isoformat(), request.get_full_path(),
+            request.accepted_renderer.format
+        )).encode()).hexdigest()
+        etag = quote_etag(f'{version}-{digest}')
+        last_modified = timegm(modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
@@ -0,0 +1,314 @@
+import base64
+import hashlib
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def parse_limit(params, name, default, cutoff=None):
+    """
+    Размер выборки из параметра запроса name: положительное целое, не
+    больше cutoff. Если параметра нет или он неверен, возвращает default.
+    """
+    try:
+        limit = int(params[name])
+    except (KeyError, ValueError):
+        return default
+    if limit < 1:
+        return default
+    return min(limit, cutoff) if cutoff else limit
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей сортировки последней (или первой)
+    записи страницы, следующая страница выбирается условием «после этого
+    ключа», поэтому любая страница стоит столько же, сколько первая,
+    и COUNT(*) не выполняется. Последнее поле сортировки должно быть
+    уникальным.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = None
+    ordering = ('-id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.sort_fields = self.get_ordering(request, queryset, view)
+        values, reverse = self.decode_cursor(request, queryset)
+
+        ordering = [
+            (name, descending != reverse, nullable)
+            for name, descending, nullable in self.sort_fields
+        ]
+        queryset = queryset.order_by(*(
+            self.order_expression(*field) for field in ordering
+        ))
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = values is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_limit(self, request):
+        return parse_limit(
+            request.query_params, self.limit_query_param,
+            self.default_limit, self.max_limit
+        )
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Возвращает сортировку как тройки (поле, по убыванию, допускает NULL).
+
+        Если у представления есть OrderingFilter, сортировка берётся из
+        него, иначе из атрибута keyset_ordering. Поле id добавляется в
+        конец, чтобы ключ был уникальным. Кроме полей модели допустимы
+        аннотации запроса.
+        """
+        ordering = getattr(view, 'keyset_ordering', self.ordering)
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        fields = []
+        for name in ordering:
+            field_name = name.lstrip('-')
+            if field_name == 'pk':
+                field_name = queryset.model._meta.pk.name
+            field = self.get_field(queryset, field_name)
+            fields.append((field_name, name.startswith('-'), field.null))
+        pk_name = queryset.model._meta.pk.name
+        if not any(name == pk_name for name, _, _ in fields):
+            fields.append((pk_name, bool(fields) and fields[0][1], False))
+        return fields
+
+    @staticmethod
+    def get_field(queryset, name):
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def order_expression(name, descending, nullable):
+        """
+        Сортировка одного поля. NULL считаются наименьшими значениями,
+        как в SQLite, поэтому порядок совпадает с порядком индекса.
+        """
+        if not nullable:
+            return f'-{name}' if descending else name
+        if descending:
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_first=True)
+
+    @staticmethod
+    def seek_filter(ordering, values):
+        """
+        Условие «строго после ключа values» для заданной сортировки.
+
+        Для первого поля без NULL добавлено нестрогое условие, чтобы
+        база могла начать чтение индекса с нужного места.
+        """
+        conditions = []
+        for position, (name, descending, nullable) in enumerate(ordering):
+            value = values[position]
+            if value is None:
+                if descending:
+                    continue
+                condition = Q(**{f'{name}__isnull': False})
+            else:
+                lookup = 'lt' if descending else 'gt'
+                condition = Q(**{f'{name}__{lookup}': value})
+                if nullable and descending:
+                    condition |= Q(**{f'{name}__isnull': True})
+            for prev_position in range(position):
+                prev_name = ordering[prev_position][0]
+                prev_value = values[prev_position]
+                condition &= (
+                    Q(**{f'{prev_name}__isnull': True}) if prev_value is None
+                    else Q(**{prev_name: prev_value})
+                )
+            conditions.append(condition)
+        seek = reduce(or_, conditions)
+        name, descending, nullable = ordering[0]
+        if not nullable:
+            lookup = 'lte' if descending else 'gte'
+            seek &= Q(**{f'{name}__{lookup}': values[0]})
+        return seek
+
+    def encode_cursor(self, row, reverse):
+        values = [
+            self.dump_value(getattr(row, name))
+            for name, _, _ in self.sort_fields
+        ]
+        data = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = [
+                self.get_field(queryset, name).to_python(value)
+                for (name, _, _), value in zip(self.sort_fields, data['v'])
+            ]
+            if len(values) != len(self.sort_fields):
+                raise ValueError
+            return values, bool(data['r'])
+        except (ValueError, KeyError, TypeError, ValidationError) as error:
+            raise NotFound(self.invalid_cursor_message) from error
+
+    @staticmethod
+    def dump_value(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.encode_cursor(self.page[-1], False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.encode_cursor(self.page[0], True))
+
+    def get_link(self, cursor):
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        url = remove_query_param(url, 'offset')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+
+class CountModePagination(LimitOffsetPagination):
+    """
+    LimitOffsetPagination с выбором способа подсчёта общего количества.
+
+    Режим задаётся параметром запроса count или атрибутом представления
+    count_mode:
+    - exact — обычный COUNT(*);
+    - cached — COUNT(*), запомненный в кэше на count_cache_timeout секунд;
+    - estimate — значение из счётчика, поддерживаемого представлением
+      (метод estimate_count), иначе как cached;
+    - none — без подсчёта.
+    Ключ count_exact в ответе сообщает, точно ли значение count.
+    Без точного подсчёта наличие следующей страницы определяется
+    выборкой на одну запись больше лимита.
+    """
+    count_query_param = 'count'
+    count_modes = ('exact', 'cached', 'estimate', 'none')
+    count_cache_timeout = 60
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.count_query_param)
+        if mode not in self.count_modes:
+            mode = getattr(view, 'count_mode', 'exact')
+        if mode == 'exact':
+            self.count_exact = True
+            return super().paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.request = request
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        self.count = None
+        self.count_exact = False
+        if mode == 'estimate' and hasattr(view, 'estimate_count'):
+            self.count = view.estimate_count(queryset)
+        if mode != 'none' and self.count is None:
+            self.count, self.count_exact = self.get_cached_count(queryset)
+        return page[:self.limit]
+
+    def get_cached_count(self, queryset):
+        """Возвращает количество из кэша или считает и запоминает его."""
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            # Условие вида pk__in=[] — выборка заведомо пуста.
+            return 0, True
+        key = 'pagination-count:' + hashlib.md5(
+            repr((sql, params)).encode()
+        ).hexdigest()
+        count = cache.get(key)
+        if count is not None:
+            return count, False
+        count = self.get_count(queryset)
+        cache.set(key, count, self.count_cache_timeout)
+        return count, True
+
+    def get_next_link(self):
+        if self.count_exact:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+            response['count_exact'] = self.count_exact
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+
+class OptionalKeysetPagination(CountModePagination):
+    """
+    CountModePagination, переходящая на курсоры по параметру cursor.
+
+    Клиенты с limit/offset продолжают работать как раньше; первый
+    запрос в режиме курсоров — ?cursor= с пустым значением.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -22,7 +22,7 @@ class IsAuthorAdminSuperuserOrReadOnlyPermission(permissions.BasePermission):
         return (request.method in permissions.SAFE_METHODS
                 or (request.user.is_admin
                     or request.user.is_moderator
-                    or obj.author == request.user))
+                    or obj.author_id == request.user.id))
 
 
 class IsAdminPermission(BasePermission):
@@ -1,10 +1,34 @@
+from collections import defaultdict
+
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from django.db.models import Avg
+from rest_framework.relations import MANY_RELATION_KWARGS
 
 from reviews.models import Comments, Genre, Category, Title, Review
+from reviews.services import bulk_create_titles
 from users.models import User
 
 
+class FieldsetMixin:
+    """
+    Оставляет только поля из fieldset контекста (его заполняет
+    SparseFieldsetMixin представления). Действует на сериализатор
+    верхнего уровня и элементы его списка; вложенные выводятся целиком.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if fieldset is None or parent is not None:
+            return fields
+        return {
+            name: field for name, field in fields.items() if name in fieldset
+        }
+
+
 class TokenSerializer(serializers.ModelSerializer):
     username = serializers.CharField(required=True)
     confirmation_code = serializers.CharField(required=True)
@@ -43,7 +67,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(FieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -52,41 +76,86 @@ class UsersSerializer(serializers.ModelSerializer):
         )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(FieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для модели Category."""
     class Meta:
-        exclude = ('id', )
+        exclude = ('id', 'normalized_slug')
         model = Category
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(FieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
     class Meta:
-        exclude = ('id', )
+        exclude = ('id', 'normalized_slug')
         model = Genre
         lookup_field = 'slug'
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class SlugListRelatedField(serializers.ManyRelatedField):
+    """
+    Список slug'ов, который разрешается одним запросом IN, а не get()
+    на каждый элемент. Обо всех неизвестных slug'ах сообщает одной
+    ошибкой.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Не найдены объекты со {slug_name}: {values}.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        slug_field = self.child_relation.slug_field
+        slugs = list(dict.fromkeys(smart_str(item) for item in data))
+        objects = {
+            smart_str(getattr(obj, slug_field)): obj
+            for obj in self.child_relation.get_queryset().filter(
+                **{f'{slug_field}__in': slugs}
+            )
+        }
+        missing = [slug for slug in slugs if slug not in objects]
+        if missing:
+            self.fail(
+                'does_not_exist', slug_name=slug_field,
+                values=', '.join(missing)
+            )
+        return [objects[slug] for slug in slugs]
+
+
+class BatchedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, с many=True разрешающий список одним запросом."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugListRelatedField(**list_kwargs)
+
+
+class TitleReadSerializer(FieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для чтения данных модели Title."""
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(
         read_only=True,
         many=True
     )
-    rating = serializers.SerializerMethodField()
+    histogram = serializers.DictField(
+        source='score_histogram',
+        child=serializers.IntegerField(),
+        read_only=True
+    )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'name', 'year', 'rating', 'histogram', 'description',
+            'genre', 'category'
+        )
         model = Title
 
-    def get_rating(self, obj):
-        if obj.reviews.count() == 0:
-            return None
-        rev = Review.objects.filter(title=obj).aggregate(rating=Avg('score'))
-        return rev['rating']
-
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для записи данных модели Title."""
@@ -94,39 +163,106 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = BatchedSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class BulkSlugField(serializers.SlugField):
+    """
+    Slug объекта model, который заменяется его id.
+
+    Сами slug'и разрешаются заранее, одним запросом на модель для всего
+    списка, в BulkSlugListSerializer; поле только читает готовый словарь.
+    """
+    default_error_messages = {
+        'does_not_exist': 'Объект со slug={value} не существует.',
+    }
+
+    def __init__(self, model, **kwargs):
+        self.model = model
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        slug = super().to_internal_value(data)
+        pk = self.context['slug_ids'][self.model].get(slug)
+        if pk is None:
+            self.fail('does_not_exist', value=slug)
+        return pk
+
+
+class BulkSlugListSerializer(serializers.ListSerializer):
+    """Список, в котором поля BulkSlugField разрешаются общими запросами."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self._context['slug_ids'] = self.resolve_slugs(data)
+        return super().to_internal_value(data)
+
+    def resolve_slugs(self, data):
+        """Возвращает {модель: {slug: id}} для slug'ов всех элементов."""
+        slugs = defaultdict(set)
+        for name, field in self.child.fields.items():
+            many = isinstance(field, serializers.ListField)
+            if many:
+                field = field.child
+            if not isinstance(field, BulkSlugField):
+                continue
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                values = value if many and isinstance(value, list) else [value]
+                slugs[field.model].update(
+                    value for value in values if isinstance(value, str)
+                )
+        return {
+            model: dict(
+                model.objects.filter(slug__in=values).values_list('slug', 'pk')
+            )
+            for model, values in slugs.items()
+        }
+
+
+class TitleBulkListSerializer(BulkSlugListSerializer):
+    """Список произведений, сохраняемый пакетными INSERT."""
+
+    def create(self, validated_data):
+        titles, genre_ids = [], []
+        for item in validated_data:
+            genre_ids.append(list(dict.fromkeys(item.pop('genre'))))
+            titles.append(Title(**item))
+        return bulk_create_titles(titles, genre_ids)
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Сериализатор элемента списка для массового создания произведений."""
+    category = BulkSlugField(Category, source='category_id')
+    genre = serializers.ListField(child=BulkSlugField(Genre))
+
+    class Meta:
+        fields = ('name', 'year', 'description', 'genre', 'category')
+        model = Title
+        list_serializer_class = TitleBulkListSerializer
+
+
+class ReviewSerializer(FieldsetMixin, serializers.ModelSerializer):
     """Сериализатор отзывов."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('version', 'modified')
         model = Review
         read_only_fields = ('title', 'author')
 
-    def validate(self, data):
-        if Review.objects.filter(
-            author=self.context['request'].user,
-            title_id=self.context['view'].kwargs.get('title_id')
-        ).exists() and self.context['request'].method == 'POST':
-            raise serializers.ValidationError(
-                'Нельзя оставить два отзыва на одно произведение.')
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(FieldsetMixin, serializers.ModelSerializer):
     """Сериализатор комментариев."""
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
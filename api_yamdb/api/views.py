@@ -1,27 +1,38 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.exceptions import ValidationError
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.decorators import action
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (SCORES, Category, Comments, Genre, Review, Title,
+                            score_field)
+from reviews.fields import normalize
+from reviews.services import (prepare_author_removal, top_title_ids,
+                              touch_reviews, touch_titles,
+                              update_title_rating)
+from users.authentication import issue_access_token
+from users.mail import enqueue_mail
 from users.models import User
-from .mixins import ModelMixinSet
-from .filters import TitleFilter
+from .mixins import (CachedListMixin, ConditionalGetMixin, ModelMixinSet,
+                     ParentObjectMixin, SparseFieldsetMixin)
+from .pagination import (CountModePagination, OptionalKeysetPagination,
+                         parse_limit)
+from .filters import (StableOrderingFilter, TitleFilter, TitleSearchFilter,
+                      UsernameSearchFilter)
 from .permissions import (IsAdminPermission, IsAdminUserOrReadOnly,
                           IsAuthorAdminSuperuserOrReadOnlyPermission, )
 from .serializers import (
     CategorySerializer, CommentSerializer, GenreSerializer,
-    ReviewSerializer, TokenSerializer, TitleReadSerializer,
-    TitleWriteSerializer, UserCreateSerializer, UsersSerializer)
+    ReviewSerializer, TokenSerializer, TitleBulkSerializer,
+    TitleReadSerializer, TitleWriteSerializer, UserCreateSerializer,
+    UsersSerializer)
 
 
 class SignUpView(APIView):
@@ -46,28 +57,34 @@ class SignUpView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = confirmation_code
-        user.save()
-
-        send_mail(
-            subject='Код подтверждения',
-            message=f'Ваш код подтверждения: {confirmation_code}',
-            from_email=settings.AUTH_EMAIL,
-            recipient_list=(user.email,),
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            user.confirmation_code = confirmation_code
+            user.save()
+            enqueue_mail(
+                subject='Код подтверждения',
+                message=f'Ваш код подтверждения: {confirmation_code}',
+                from_email=settings.AUTH_EMAIL,
+                recipient_list=(user.email,),
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class UsersViewSet(viewsets.ModelViewSet):
+class UsersViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UsersSerializer
     permission_classes = (IsAdminPermission,)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (UsernameSearchFilter, StableOrderingFilter)
     lookup_field = 'username'
     search_fields = ('username',)
+    ordering_fields = ('id', 'username')
+    ordering = ('id',)
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = LimitOffsetPagination
+    pagination_class = OptionalKeysetPagination
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        prepare_author_removal(instance)
+        instance.delete()
 
     @action(detail=False, methods=['get', 'patch'], url_path='me',
             url_name='me', permission_classes=(permissions.IsAuthenticated,))
@@ -99,11 +116,11 @@ class TokenView(APIView):
         confirmation_code = serializer.data['confirmation_code']
         if not default_token_generator.check_token(user, confirmation_code):
             raise ValidationError('Неверный код')
-        token = AccessToken.for_user(user)
+        token = issue_access_token(user)
         return Response({'token': str(token)}, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(ModelMixinSet):
+class CategoryViewSet(SparseFieldsetMixin, CachedListMixin, ModelMixinSet):
     """Получить список всех категорий без токена."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -111,10 +128,10 @@ class CategoryViewSet(ModelMixinSet):
     filter_backends = (filters.SearchFilter, )
     search_fields = ('name', )
     lookup_field = 'slug'
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountModePagination
 
 
-class GenreViewSet(ModelMixinSet):
+class GenreViewSet(SparseFieldsetMixin, CachedListMixin, ModelMixinSet):
     """
     Получить список всех жанров без токена."""
     queryset = Genre.objects.all()
@@ -123,66 +140,244 @@ class GenreViewSet(ModelMixinSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name', )
     lookup_field = 'slug'
-    pagination_class = LimitOffsetPagination
+    pagination_class = CountModePagination
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SparseFieldsetMixin, ConditionalGetMixin,
+                   viewsets.ModelViewSet):
     """Получить список всех объектов без токена."""
-    queryset = Title.objects.all()
     permission_classes = (IsAdminUserOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, )
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, StableOrderingFilter
+    )
     filterset_class = TitleFilter
-    pagination_class = LimitOffsetPagination
+    ordering_fields = ('id', 'name', 'year', 'rating', 'reviews_count')
+    ordering = ('id',)
+    pagination_class = OptionalKeysetPagination
+
+    fieldset_columns = {
+        'histogram': tuple(score_field(score) for score in SCORES),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+
+    top_limit = 20
+    top_max_limit = 100
+    bulk_max_items = 1000
+
+    def get_queryset(self):
+        if self.action not in ('list', 'retrieve', 'top'):
+            return Title.objects.all()
+        queryset = Title.objects.all()
+        if self.fieldset_includes('category'):
+            queryset = queryset.select_related('category')
+        if self.fieldset_includes('genre'):
+            queryset = queryset.prefetch_related('genre')
+        return self.only_fieldset(queryset)
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        """
+        Лучшие по рейтингу произведения: ?category= или ?genre=,
+        без них — по всему каталогу; ?limit= — сколько вернуть.
+        """
+        category = request.query_params.get('category')
+        genre = request.query_params.get('genre')
+        if category and genre:
+            raise ValidationError('Укажите либо category, либо genre.')
+        limit = parse_limit(
+            request.query_params, 'limit', self.top_limit, self.top_max_limit
+        )
+        groups = {}
+        for name, model, slug in (
+            ('category_id', Category, category), ('genre_id', Genre, genre)
+        ):
+            if slug:
+                groups[name] = model.objects.filter(
+                    normalized_slug=normalize(slug)
+                ).values_list('pk', flat=True).first()
+                if groups[name] is None:
+                    raise NotFound(
+                        f'Не найдено: {model._meta.verbose_name.lower()} '
+                        f'{slug}.'
+                    )
+        title_ids = top_title_ids(limit, **groups)
+        titles = self.get_queryset().in_bulk(title_ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in title_ids], many=True
+        )
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Создаёт список произведений одной транзакцией. Если хотя бы
+        одно невалидно, ничего не сохраняется, а ошибки возвращаются
+        списком по элементам.
+        """
+        if (isinstance(request.data, list)
+                and len(request.data) > self.bulk_max_items):
+            raise ValidationError(
+                f'Не больше {self.bulk_max_items} произведений за запрос.'
+            )
+        serializer = TitleBulkSerializer(
+            data=request.data, many=True,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        prefetch_related_objects(titles, 'category', 'genre')
+        return Response(
+            TitleReadSerializer(titles, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def get_validators(self):
+        if self.action != 'retrieve':
+            return None
+        try:
+            return Title.objects.filter(
+                pk=self.kwargs.get('pk')
+            ).values_list('version', 'modified').first()
+        except (TypeError, ValueError):
+            # Неверный id: 404 вернёт get_object().
+            return None
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        title = serializer.save()
+        touch_titles(pk=title.pk)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(SparseFieldsetMixin, ParentObjectMixin,
+                    ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет отзывов."""
     serializer_class = ReviewSerializer
     permission_classes = [
         IsAuthorAdminSuperuserOrReadOnlyPermission,
         permissions.IsAuthenticatedOrReadOnly
     ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    parent_fields = ('version', 'modified', 'reviews_count')
+    fieldset_columns = {'author': ('author__username',)}
+
+    def estimate_count(self, queryset):
+        """Количество отзывов из счётчика произведения."""
+        return self.get_parent().reviews_count
+
+    def get_validators(self):
+        if self.action == 'retrieve':
+            try:
+                return Review.objects.filter(
+                    pk=self.kwargs.get('pk'),
+                    title_id=self.kwargs.get('title_id')
+                ).values_list('version', 'modified').first()
+            except (TypeError, ValueError):
+                # Неверный id: 404 вернёт get_object().
+                return None
+        title = self.get_parent()
+        return title.version, title.modified
 
     def get_queryset(self):
-        title = get_object_or_404(
-            Title, pk=self.kwargs.get('title_id')
-        )
-        return title.reviews.all()
+        if self.action == 'list':
+            title_id = self.get_parent().pk
+        else:
+            title_id = self.kwargs.get('title_id')
+        queryset = Review.objects.filter(title_id=title_id)
+        if self.fieldset_includes('author'):
+            queryset = queryset.select_related('author')
+        return self.only_fieldset(queryset)
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(
-            author=self.request.user, title=title
+        title = self.get_parent()
+        try:
+            with transaction.atomic():
+                review = serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повтор ловит ограничение unique review, а не проверка
+            # заранее: так не тратится запрос и не проходят гонки.
+            if not Review.objects.filter(
+                author=self.request.user, title=title
+            ).exists():
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Нельзя оставить два отзыва на одно произведение.'
+            ]})
+        update_title_rating(review.title_id, added=review.score)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Оценка, загруженная get_object() до транзакции, могла устареть:
+        # перечитываем её под блокировкой строки.
+        old_score = Review.objects.select_for_update().filter(
+            pk=serializer.instance.pk
+        ).values_list('score', flat=True).first()
+        if old_score is None:
+            raise NotFound
+        review = serializer.save()
+        touch_reviews(pk=review.pk)
+        update_title_rating(
+            review.title_id, added=review.score, removed=old_score
         )
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Рейтинг меняется, только если строку удалил этот запрос:
+        # повторный DELETE того же отзыва не вычитает оценку дважды.
+        reviews = Review.objects.filter(pk=instance.pk)
+        score = reviews.select_for_update().values_list(
+            'score', flat=True
+        ).first()
+        _, deleted = reviews.delete()
+        if deleted.get(Review._meta.label):
+            update_title_rating(instance.title_id, removed=score)
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(SparseFieldsetMixin, ParentObjectMixin,
+                     ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет комментариев."""
     serializer_class = CommentSerializer
     permission_classes = [
         IsAuthorAdminSuperuserOrReadOnlyPermission,
         permissions.IsAuthenticatedOrReadOnly
     ]
-    pagination_class = LimitOffsetPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    parent_fields = ('version', 'modified')
+    fieldset_columns = {'author': ('author__username',)}
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get('review_id'),
-            title_id=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+        queryset = Comments.objects.filter(review_id=self.get_parent().pk)
+        if self.fieldset_includes('author'):
+            queryset = queryset.select_related('author')
+        return self.only_fieldset(queryset)
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id')
-        )
+        review = self.get_parent()
         serializer.save(
             author=self.request.user, review=review
         )
+        touch_reviews(pk=review.pk)
+
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        touch_reviews(pk=comment.review_id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        touch_reviews(pk=instance.review_id)
+
+    def get_validators(self):
+        review = self.get_parent()
+        return review.version, review.modified
@@ -74,6 +74,15 @@ DATABASES = {
     }
 }
 
+# Кэш общий только в пределах процесса; при нескольких воркерах
+# используйте django.core.cache.backends.filebased.FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    }
+}
+
 
 # Password validation
 
@@ -94,7 +103,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -103,6 +112,15 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 }
 
+# Кэш пользователей для CachedJWTAuthentication: размер и время жизни
+# записи в секундах.
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 60
+
+# True — записывать в access-токен имя, роль и версию токенов, чтобы
+# проверять права без чтения пользователя из базы.
+JWT_ROLE_CLAIMS = False
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -113,6 +131,9 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'tmp/email')
 EMAIL_HOST = 'localhost'
 EMAIL_PORT = 25
 AUTH_EMAIL = 'auth@api_yamdb.com'
+# Письма уходят из очереди командой mail_worker. False — отправлять сразу
+# после фиксации транзакции, оставляя в очереди только неудачные.
+EMAIL_OUTBOX_ASYNC = True
 
 # Internationalization
 
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+def normalize(value):
+    """Приводит строку к виду для сравнения без учёта регистра."""
+    return value.casefold() if value is not None else None
+
+
+class NormalizedField(models.CharField):
+    """
+    Копия поля source, приведённая к нижнему регистру.
+
+    Значение вычисляется при записи в pre_save, как у auto_now, поэтому
+    заполняется и через save(), и в bulk_create. Поиск без учёта
+    регистра сводится к точному сравнению по индексу этого поля.
+    """
+
+    def __init__(self, *args, source, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
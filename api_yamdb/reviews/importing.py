@@ -0,0 +1,370 @@
+import csv
+import io
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from itertools import groupby
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import (DEFAULT_DB_ALIAS, IntegrityError, connection,
+                       connections, transaction)
+from django.utils import timezone
+
+from .fields import NormalizedField, normalize
+
+BLOCK_SIZE = 1 << 20
+
+
+def record_ranges(path, size):
+    """
+    Делит CSV-файл на диапазоны байтов (start, end) длиной около size.
+
+    Первый диапазон — строка заголовка. Границы ставятся только на
+    переводах строк вне кавычек, поэтому многострочное значение в
+    кавычках не разрезается. Файл читается блоками, разбирать его
+    целиком не нужно: достаточно считать кавычки.
+    """
+    start = offset = quotes = 0
+    target = 1
+    with open(path, 'rb') as csv_file:
+        for block in iter(partial(csv_file.read, BLOCK_SIZE), b''):
+            pos = max(target - offset, 0)
+            while pos < len(block):
+                newline = block.find(b'\n', pos)
+                if newline == -1:
+                    break
+                pos = newline + 1
+                if (quotes + block.count(b'"', 0, newline)) % 2:
+                    continue
+                end = offset + pos
+                yield start, end
+                start, target = end, end + size
+                pos = max(target - offset, pos)
+            quotes += block.count(b'"')
+            offset += len(block)
+    if start < offset:
+        yield start, offset
+
+
+def read_slice(path, start, end):
+    """Разбирает записи CSV-файла из диапазона байтов [start, end)."""
+    with open(path, 'rb') as csv_file:
+        csv_file.seek(start)
+        text = csv_file.read(end - start).decode('utf-8')
+    return list(csv.reader(io.StringIO(text, newline='')))
+
+
+def dependency_order(models):
+    """
+    Упорядочивает модели так, чтобы каждая шла после тех, на которые
+    ссылается внешними ключами.
+
+    Граф строится по полям моделей; при равенстве сохраняется исходный
+    порядок. Связи с моделями вне списка не учитываются.
+    """
+    dependencies = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    ordered = []
+    while dependencies:
+        ready = [
+            model for model in models
+            if model in dependencies and not dependencies[model] - set(ordered)
+        ]
+        if not ready:
+            raise ValueError(
+                'Циклическая зависимость между моделями: '
+                + ', '.join(model.__name__ for model in dependencies)
+            )
+        for model in ready:
+            ordered.append(model)
+            del dependencies[model]
+    return ordered
+
+
+def setup_worker():
+    """Готовит Django в процессе пула, если он запущен через spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+PLAIN_TYPES = {
+    'AutoField', 'BigAutoField', 'BigIntegerField', 'CharField',
+    'EmailField', 'FloatField', 'ForeignKey', 'IntegerField',
+    'PositiveBigIntegerField', 'PositiveIntegerField',
+    'PositiveSmallIntegerField', 'SlugField', 'SmallIntegerField',
+    'TextField',
+}
+
+
+class RowPreparer:
+    """
+    Готовит строки файла к записи одним executemany.
+
+    fields — все колонки таблицы, которые пишутся: сначала колонки
+    файла, затем остальные поля модели. Значения, которых нет в файле,
+    берутся из defaults, auto_now/auto_now_add, NormalizedField или
+    значения по умолчанию поля — так же, как их заполнил бы save().
+    Не обращается к базе, поэтому работает и в процессе пула.
+    """
+
+    def __init__(self, model, columns, defaults=None):
+        defaults = defaults or {}
+        self.file_fields = [
+            model._meta.get_field(column) for column in columns
+        ]
+        self.fields = list(self.file_fields)
+        self.constants = []
+        self.derived = []
+        now = timezone.now()
+        positions = {field.attname: pos for pos, field in enumerate(
+            self.file_fields
+        )}
+        for field in model._meta.concrete_fields:
+            if field in self.file_fields or (
+                field.primary_key and field.auto_created
+            ):
+                continue
+            if isinstance(field, NormalizedField):
+                source = model._meta.get_field(field.source).attname
+                self.derived.append((positions[source], field))
+                continue
+            if field.attname in defaults:
+                value = defaults[field.attname]
+            elif getattr(field, 'auto_now', False) or getattr(
+                field, 'auto_now_add', False
+            ):
+                value = now
+            else:
+                value = field.get_default()
+            self.constants.append(
+                (field, field.get_db_prep_save(value, connection))
+            )
+        self.fields += [field for _, field in self.derived]
+        self.fields += [field for field, _ in self.constants]
+        self.relations = [
+            (pos, column, field)
+            for pos, (column, field) in enumerate(zip(
+                columns, self.file_fields
+            ))
+            if field.is_relation
+        ]
+
+    @staticmethod
+    def converter(field):
+        """Функция, приводящая строку файла к значению поля."""
+        convert = (
+            field.target_field.to_python if field.is_relation
+            else lambda value: field.clean(value, None)
+        )
+        if not field.null:
+            return convert
+        return lambda value: None if value == '' else convert(value)
+
+    def prepare(self, rows):
+        """
+        Возвращает кортежи значений колонок и ошибки как пары
+        (номер строки в списке, текст).
+        """
+        constants = tuple(value for _, value in self.constants)
+        converters = [self.converter(field) for field in self.file_fields]
+        # Для строк и чисел значение после clean() уже готово к записи,
+        # get_db_prep_save нужен только остальным типам. Соединение
+        # берётся один раз: прокси django.db.connection на каждое
+        # значение дороже самой подготовки.
+        db = connections[DEFAULT_DB_ALIAS]
+        preps = [
+            None if field.get_internal_type() in PLAIN_TYPES
+            else field.get_db_prep_save
+            for field in self.fields
+        ]
+        prepared, errors = [], []
+        for index, row in enumerate(rows):
+            if len(row) != len(converters):
+                errors.append((index, (
+                    f': ожидалось {len(converters)} колонок, '
+                    f'получено {len(row)}.'
+                )))
+                continue
+            values = []
+            try:
+                for convert, value in zip(converters, row):
+                    values.append(convert(value))
+            except ValidationError as error:
+                field = self.file_fields[len(values)]
+                errors.append((index, (
+                    f', поле {field.name}: ' + ' '.join(error.messages)
+                )))
+                continue
+            values += [normalize(values[pos]) for pos, _ in self.derived]
+            prepared.append(tuple(
+                value if prep is None else prep(value, db)
+                for prep, value in zip(preps, values)
+            ) + constants)
+        return prepared, errors
+
+
+_preparers = {}
+
+
+def prepare_slice(model_label, columns, defaults, path, start, end):
+    """
+    Читает, проверяет и превращает в кортежи для INSERT записи файла из
+    диапазона байтов.
+
+    Выполняется в процессе пула: родитель передаёт только путь и
+    границы, а получает готовые строки. Подготовитель создаётся один
+    раз на файл и процесс.
+    """
+    key = (model_label, tuple(columns))
+    if key not in _preparers:
+        _preparers[key] = RowPreparer(
+            apps.get_model(model_label), columns, defaults
+        )
+    return _preparers[key].prepare(read_slice(path, start, end))
+
+
+class InlineExecutor:
+    """Выполняет задачи сразу в текущем процессе, без пула."""
+
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def ordered_map(executor, tasks, window):
+    """
+    Отдаёт результаты задач в порядке их постановки.
+
+    Вперёд ставится не больше window задач, так что память не растёт
+    вместе с размером файлов, а пул успевает разбирать следующий файл,
+    пока идёт запись текущего.
+    """
+    pending = deque()
+    for task, args in tasks:
+        pending.append((task, executor.submit(prepare_slice, *args)))
+        if len(pending) >= window:
+            task, future = pending.popleft()
+            yield task, future.result()
+    while pending:
+        task, future = pending.popleft()
+        yield task, future.result()
+
+
+class DataImportError(Exception):
+    """Ошибка в данных импортируемого файла."""
+
+
+class TableWriter:
+    """
+    Записывает подготовленные строки одного файла в таблицу модели.
+
+    Строки вставляются через executemany без создания объектов моделей.
+    Внешние ключи проверяются по множествам первичных ключей связанных
+    моделей, прочитанным один раз при создании, то есть после записи
+    файлов, от которых зависит модель.
+    """
+
+    def __init__(self, preparer):
+        self.preparer = preparer
+        self.count = 0
+        model = preparer.fields[0].model
+        quote = connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in preparer.fields),
+            ', '.join(['%s'] * len(preparer.fields))
+        )
+        self.related = [
+            (pos, column, set(
+                field.related_model.objects.values_list('pk', flat=True)
+                .iterator()
+            ))
+            for pos, column, field in preparer.relations
+        ]
+
+    def write(self, rows, first_number):
+        for pos, column, pks in self.related:
+            for number, row in enumerate(rows, first_number):
+                if row[pos] is not None and row[pos] not in pks:
+                    raise DataImportError(
+                        f'запись {number}: не найден объект '
+                        f'{column}={row[pos]}.'
+                    )
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, rows)
+        self.count += len(rows)
+
+
+@transaction.atomic
+def write_file(model, results, defaults):
+    """
+    Записывает подготовленные порции одного файла в одной транзакции.
+    Возвращает количество строк.
+    """
+    writer = None
+    number = 1
+    for (_, columns), (rows, errors) in results:
+        if errors:
+            raise DataImportError('; '.join(
+                f'запись {number + index}{text}'
+                for index, text in errors[:10]
+            ))
+        if writer is None:
+            writer = TableWriter(RowPreparer(model, columns, defaults))
+        writer.write(rows, number)
+        number += len(rows)
+    return writer.count
+
+
+def import_files(files, executor, chunk_size, window, defaults=None):
+    """
+    Загружает файлы в порядке зависимостей их моделей.
+
+    files — пары (путь, модель). Файлы делятся на куски примерно по
+    chunk_size байт; чтение, разбор, проверка и подготовка строк к
+    INSERT идут в executor, запись — в текущем процессе, по одной
+    транзакции на файл. После записи каждого файла отдаёт путь, модель
+    и количество строк.
+    """
+    defaults = defaults or {}
+    paths = {model: path for path, model in files}
+
+    def tasks():
+        for model in dependency_order(list(paths)):
+            path = paths[model]
+            ranges = record_ranges(path, chunk_size)
+            header = next(ranges, None)
+            columns = read_slice(path, *header)[0] if header else []
+            args = (model._meta.label, columns, defaults.get(model), path)
+            end = header[1] if header else 0
+            yield (model, columns), args + (end, end)
+            for start, end in ranges:
+                yield (model, columns), args + (start, end)
+
+    results = ordered_map(executor, tasks(), window)
+    for model, group in groupby(results, key=lambda result: result[0][0]):
+        name = paths[model].name
+        try:
+            count = write_file(model, group, defaults.get(model))
+        except DataImportError as error:
+            raise DataImportError(f'{name}, {error}') from error
+        except IntegrityError as error:
+            raise DataImportError(
+                f'{name}: {error}. Возможно, эти записи уже загружены.'
+            ) from error
+        yield paths[model], model, count
@@ -0,0 +1,123 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
+
+from reviews.importing import (BLOCK_SIZE, DataImportError, InlineExecutor,
+                               import_files, setup_worker)
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+
+CSV_FILES = {
+    'users.csv': User,
+    'category.csv': Category,
+    'genre.csv': Genre,
+    'titles.csv': Title,
+    'genre_title.csv': Title.genre.through,
+    'review.csv': Review,
+    'comments.csv': Comments,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV-файлов static/data в базу данных. '
+        'Файлы записываются в порядке зависимостей моделей, куски '
+        'файлов читаются, разбираются и проверяются в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files', nargs='*',
+            help='Имена файлов для загрузки, по умолчанию все.'
+        )
+        parser.add_argument(
+            '--path', type=Path, default=DATA_DIR,
+            help='Папка с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=BLOCK_SIZE,
+            help=(
+                'Примерный размер в байтах куска файла, который процесс '
+                'пула читает и разбирает целиком.'
+            )
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов для разбора файлов; 1 — без пула.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError(
+                '--chunk-size и --workers должны быть больше нуля.'
+            )
+        unknown = set(options['files']) - set(CSV_FILES)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные файлы: {", ".join(sorted(unknown))}.'
+            )
+        files = []
+        for name, model in CSV_FILES.items():
+            if options['files'] and name not in options['files']:
+                continue
+            path = options['path'] / name
+            if not path.exists():
+                raise CommandError(f'Файл {path} не найден.')
+            files.append((path, model))
+
+        workers = options['workers']
+        executor = (
+            ProcessPoolExecutor(workers, initializer=setup_worker)
+            if workers > 1 else InlineExecutor()
+        )
+        defaults = {User: {'password': make_password(None)}}
+        started = total_started = time.monotonic()
+        total = 0
+        try:
+            with executor:
+                for path, model, count in import_files(
+                    files, executor, options['chunk_size'],
+                    window=workers * 4, defaults=defaults
+                ):
+                    self.reset_sequence(model)
+                    elapsed = time.monotonic() - started
+                    total += count
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{path.name}: {count} строк за '
+                        f'{elapsed:.2f} с ({count / max(elapsed, 1e-6):.0f} '
+                        'строк/с)'
+                    ))
+                    started = time.monotonic()
+        except DataImportError as error:
+            raise CommandError(str(error))
+        elapsed = time.monotonic() - total_started
+        self.stdout.write(
+            f'Всего: {total} строк за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с)'
+        )
+        self.rebuild_aggregates({model for _, model in files})
+
+    def rebuild_aggregates(self, loaded):
+        """Пересчитывает рейтинги и таблицы лидеров после загрузки."""
+        if Review in loaded:
+            call_command('rebuild_ratings', stdout=self.stdout)
+        if loaded & {Title, Title.genre.through, Review}:
+            call_command('rebuild_leaderboards', stdout=self.stdout)
+
+    @staticmethod
+    def reset_sequence(model):
+        """Сдвигает счётчик первичных ключей после вставки id из файла."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [model])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
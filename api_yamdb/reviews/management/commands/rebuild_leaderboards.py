@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.services import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает таблицы лидеров категорий и жанров по сохранённым '
+        'рейтингам произведений.'
+    )
+
+    def handle(self, *args, **options):
+        total = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в таблицах лидеров: {total}.'
+        ))
@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import SCORES, Title, score_field
+from reviews.services import calculate_histograms, refresh_leaderboards
+
+FIELDS = ('score_sum', 'reviews_count', 'rating') + tuple(
+    score_field(score) for score in SCORES
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые рейтинги и гистограммы оценок '
+        'произведений по отзывам порциями и сообщает о расхождениях.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Количество произведений в одной порции.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только проверить значения, ничего не записывая.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        checked = mismatched = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                titles = list(
+                    Title.objects.filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only(*FIELDS)
+                    [:chunk_size]
+                )
+                if not titles:
+                    break
+                last_pk = titles[-1].pk
+                stale = self.find_stale(titles)
+                if stale and not options['check']:
+                    for title in stale:
+                        title.version = F('version') + 1
+                        title.modified = timezone.now()
+                    Title.objects.bulk_update(
+                        stale, FIELDS + ('version', 'modified')
+                    )
+                    refresh_leaderboards([title.pk for title in stale])
+            checked += len(titles)
+            mismatched += len(stale)
+
+        if options['check']:
+            if mismatched:
+                raise CommandError(
+                    f'Проверено произведений: {checked}, '
+                    f'с неверным рейтингом или гистограммой: {mismatched}.'
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'Проверено произведений: {checked}, расхождений нет.'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено произведений: {checked}, исправлено: {mismatched}.'
+        ))
+
+    @staticmethod
+    def find_stale(titles):
+        """Возвращает произведения с устаревшим рейтингом или гистограммой."""
+        histograms = calculate_histograms([title.pk for title in titles])
+        stale = []
+        for title in titles:
+            histogram = histograms.get(title.pk, {})
+            score_sum = sum(
+                score * count for score, count in histogram.items()
+            )
+            reviews_count = sum(histogram.values())
+            expected = {
+                'score_sum': score_sum,
+                'reviews_count': reviews_count,
+                'rating': score_sum / reviews_count if reviews_count else None,
+            }
+            for score in SCORES:
+                expected[score_field(score)] = histogram.get(score, 0)
+            if any(
+                getattr(title, name) != value
+                for name, value in expected.items()
+            ):
+                for name, value in expected.items():
+                    setattr(title, name, value)
+                stale.append(title)
+        return stale
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+import reviews.fields
+
+BATCH_SIZE = 1000
+
+
+def fill_normalized(apps, schema_editor):
+    """Заполняет нормализованные колонки существующих строк порциями."""
+    for model_name, source, target in (
+        ('Category', 'slug', 'normalized_slug'),
+        ('Genre', 'slug', 'normalized_slug'),
+        ('Title', 'name', 'normalized_name'),
+    ):
+        model = apps.get_model('reviews', model_name)
+        batch = []
+        for obj in model.objects.only('pk', source).iterator():
+            setattr(obj, target, reviews.fields.normalize(getattr(obj, source)))
+            batch.append(obj)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, [target])
+                batch = []
+        model.objects.bulk_update(batch, [target])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='normalized_slug',
+            field=reviews.fields.NormalizedField(db_index=True, default='', editable=False, max_length=50, source='slug', verbose_name='URL категории в нижнем регистре'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='normalized_slug',
+            field=reviews.fields.NormalizedField(db_index=True, default='', editable=False, max_length=50, source='slug', verbose_name='URL жанра в нижнем регистре'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='normalized_name',
+            field=reviews.fields.NormalizedField(db_index=True, default='', editable=False, max_length=200, source='name', verbose_name='Название в нижнем регистре'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized, migrations.RunPython.noop),
+    ]
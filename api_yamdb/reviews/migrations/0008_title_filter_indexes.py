@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_normalized_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'year'], name='title_category_year_idx'),
+        ),
+        # Связующая таблица создана Django автоматически, индексы в Meta
+        # ей не задать. (genre_id, title_id) покрывает выборку
+        # произведений по жанрам без обращения к строкам таблицы.
+        migrations.RunSQL(
+            'CREATE INDEX title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX title_genre_genre_title_idx',
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2 on 2026-10-18 02:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ordering_by_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreLeaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Лидер жанра',
+                'verbose_name_plural': 'Лидеры жанров',
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryLeaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='reviews.category', verbose_name='Категория')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Лидер категории',
+                'verbose_name_plural': 'Лидеры категорий',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='genreleaderboard',
+            index=models.Index(fields=['genre', '-rating', '-title'], name='genre_leaderboard_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='genreleaderboard',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique genre leaderboard title'),
+        ),
+        migrations.AddIndex(
+            model_name='categoryleaderboard',
+            index=models.Index(fields=['category', '-rating', '-title'], name='category_leaderboard_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryleaderboard',
+            constraint=models.UniqueConstraint(fields=('title',), name='unique category leaderboard title'),
+        ),
+        migrations.RunSQL(
+            'INSERT INTO reviews_categoryleaderboard '
+            '(title_id, category_id, rating, reviews_count) '
+            'SELECT id, category_id, rating, reviews_count '
+            'FROM reviews_title WHERE category_id IS NOT NULL',
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            'INSERT INTO reviews_genreleaderboard '
+            '(title_id, genre_id, rating, reviews_count) '
+            'SELECT title.id, link.genre_id, title.rating, title.reviews_count '
+            'FROM reviews_title_genre link '
+            'JOIN reviews_title title ON title.id = link.title_id',
+            migrations.RunSQL.noop,
+        ),
+    ]
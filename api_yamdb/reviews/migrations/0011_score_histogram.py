@@ -0,0 +1,75 @@
+# Generated by Django 3.2 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+FILL_HISTOGRAM = (
+    'UPDATE reviews_title SET score_{score}_count = ('
+    'SELECT COUNT(*) FROM reviews_review review '
+    'WHERE review.title_id = reviews_title.id AND review.score = {score}) '
+    'WHERE reviews_count > 0'
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_leaderboards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Оценок 9'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            FILL_HISTOGRAM.format(score=score), migrations.RunSQL.noop
+        )
+        for score in range(1, 11)
+    ]
@@ -1,10 +1,17 @@
 from django.db import models
 from django.core.validators import MaxValueValidator, MinValueValidator
+from .fields import NormalizedField
 from .validators import validate_year
 from users.models import User
 
 
 LETTERS_LIMIT = 15
+SCORES = range(1, 11)
+
+
+def score_field(score):
+    """Имя поля гистограммы произведения для оценки score."""
+    return f'score_{score}_count'
 
 
 class Category(models.Model):
@@ -17,6 +24,11 @@ class Category(models.Model):
         unique=True,
         db_index=True
     )
+    normalized_slug = NormalizedField(
+        'URL категории в нижнем регистре',
+        max_length=50,
+        source='slug'
+    )
 
     class Meta:
         verbose_name = 'Категория'
@@ -36,6 +48,11 @@ class Genre(models.Model):
         unique=True,
         db_index=True
     )
+    normalized_slug = NormalizedField(
+        'URL жанра в нижнем регистре',
+        max_length=50,
+        source='slug'
+    )
 
     class Meta:
         verbose_name = 'Жанр'
@@ -51,6 +68,11 @@ class Title(models.Model):
         max_length=200,
         db_index=True
     )
+    normalized_name = NormalizedField(
+        'Название в нижнем регистре',
+        max_length=200,
+        source='name'
+    )
     year = models.IntegerField(
         'Год выхода',
         validators=(validate_year, )
@@ -74,6 +96,37 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Жанр'
     )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True
+    )
+    score_1_count = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2_count = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3_count = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4_count = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5_count = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6_count = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7_count = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8_count = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9_count = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10_count = models.PositiveIntegerField('Оценок 10', default=0)
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=0
+    )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         verbose_name = 'Произведение'
@@ -81,11 +134,34 @@ class Title(models.Model):
         indexes = [
             models.Index(fields=['name', 'year']),
             models.Index(fields=['name'], name='name_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_idx'),
+            models.Index(fields=['rating', 'id'], name='title_rating_idx'),
+            models.Index(
+                fields=['reviews_count', 'id'], name='title_reviews_count_idx'
+            ),
+            models.Index(
+                fields=['category', 'year'], name='title_category_year_idx'
+            ),
+            models.Index(
+                fields=['category', 'rating'], name='title_category_rating_idx'
+            ),
+            models.Index(
+                fields=['category', 'reviews_count'],
+                name='title_category_count_idx'
+            ),
+            models.Index(
+                fields=['category', 'name'], name='title_category_name_idx'
+            ),
         ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_histogram(self):
+        """Количество отзывов с каждой оценкой от 1 до 10."""
+        return {score: getattr(self, score_field(score)) for score in SCORES}
+
 
 class Review(models.Model):
     """Модель отзывов."""
@@ -114,6 +190,14 @@ class Review(models.Model):
             MaxValueValidator(10, message='Оценка должна быть до 10')
         ]
     )
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=0
+    )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         constraints = [
@@ -121,6 +205,12 @@ class Review(models.Model):
                 fields=['author', 'title'], name='unique review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         ordering = ['-pub_date']
 
     def __str__(self):
@@ -149,7 +239,85 @@ class Comments(models.Model):
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
         ordering = ['-pub_date']
 
     def __str__(self):
         return self.text[:LETTERS_LIMIT]
+
+
+class LeaderboardEntry(models.Model):
+    """Строка таблицы лидеров: рейтинг произведения в одной подборке."""
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение'
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0
+    )
+
+    class Meta:
+        abstract = True
+
+
+class CategoryLeaderboard(LeaderboardEntry):
+    """Рейтинг произведений внутри категории."""
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='leaderboard',
+        verbose_name='Категория'
+    )
+
+    class Meta:
+        verbose_name = 'Лидер категории'
+        verbose_name_plural = 'Лидеры категорий'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title'], name='unique category leaderboard title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['category', '-rating', '-title'],
+                name='category_leaderboard_idx'
+            ),
+        ]
+
+
+class GenreLeaderboard(LeaderboardEntry):
+    """Рейтинг произведений внутри жанра."""
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='leaderboard',
+        verbose_name='Жанр'
+    )
+
+    class Meta:
+        verbose_name = 'Лидер жанра'
+        verbose_name_plural = 'Лидеры жанров'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'genre'],
+                name='unique genre leaderboard title'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['genre', '-rating', '-title'],
+                name='genre_leaderboard_idx'
+            ),
+        ]
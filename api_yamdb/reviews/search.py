@@ -0,0 +1,113 @@
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+
+FTS_TRIGGERS = {
+    'reviews_title_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert
+        AFTER INSERT ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'reviews_title_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete
+        AFTER DELETE ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (reviews_title_fts, rowid, name,
+                                           description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'reviews_title_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update
+        AFTER UPDATE OF name, description ON reviews_title
+        BEGIN
+            INSERT INTO reviews_title_fts (reviews_title_fts, rowid, name,
+                                           description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO reviews_title_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+_fts_tables = {}
+
+
+def fts_available(using, table=FTS_TABLE):
+    """Есть ли в базе таблица FTS5 table (по умолчанию — произведений)."""
+    if (using, table) not in _fts_tables:
+        connection = connections[using]
+        _fts_tables[using, table] = (
+            connection.vendor == 'sqlite'
+            and table in connection.introspection.table_names()
+        )
+    return _fts_tables[using, table]
+
+
+def restore_fts_triggers(using, table, triggers):
+    """
+    Пересоздаёт потерянные триггеры таблицы FTS5 и перестраивает индекс.
+
+    SQLite при изменении колонок пересоздаёт таблицу, и её триггеры
+    пропадают вместе со старой таблицей; вызывается после migrate.
+    """
+    if not fts_available(using, table):
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if set(triggers) <= existing:
+            return False
+        for sql in triggers.values():
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {table} ({table}) VALUES ('rebuild')"
+        )
+    return True
+
+
+def fts_query(text):
+    """
+    Превращает строку поиска в запрос FTS5: каждое слово берётся
+    в кавычки, чтобы операторы FTS5 из ввода не интерпретировались,
+    последнее ищется по префиксу. Все слова должны встретиться.
+    """
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in text.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_titles(queryset, text, rank_name='search_rank'):
+    """
+    Отбирает произведения, в названии или описании которых есть слова
+    из text.
+
+    С FTS5 результаты получают аннотацию rank_name — оценку bm25, где
+    меньше значит релевантнее; без FTS5 выполняется icontains по обоим
+    полям без ранжирования.
+    """
+    query = fts_query(text)
+    if not query:
+        return queryset
+    if not fts_available(queryset.db):
+        terms = Q()
+        for term in text.split():
+            terms &= Q(name__icontains=term) | Q(description__icontains=term)
+        return queryset.filter(terms)
+    table = queryset.model._meta.db_table
+    return queryset.annotate(**{rank_name: RawSQL(
+        f'SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+        (query,), output_field=FloatField()
+    )}).filter(id__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        (query,)
+    ))
@@ -0,0 +1,264 @@
+from django.db import connection, transaction
+from django.db.models import (Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Value, When)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import (CategoryLeaderboard, GenreLeaderboard, Review, Title,
+                     score_field)
+
+LEADERBOARDS = (CategoryLeaderboard, GenreLeaderboard)
+
+
+def update_title_rating(title_id, added=None, removed=None):
+    """
+    Учитывает в произведении добавленную и (или) убранную оценку.
+
+    Сумма, количество оценок и гистограмма обновляются одним UPDATE
+    через F-выражения, поэтому параллельные отзывы не затирают друг
+    друга. Вызывать внутри той же транзакции, в которой создаётся,
+    меняется или удаляется отзыв, а убранную оценку читать в ней же под
+    select_for_update: иначе параллельные запросы учтут её дважды.
+    Заодно сдвигается версия произведения: меняются его рейтинг и список
+    отзывов.
+    """
+    score_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    histogram = {}
+    if added != removed:
+        if added is not None:
+            histogram[score_field(added)] = F(score_field(added)) + 1
+        if removed is not None:
+            histogram[score_field(removed)] = F(score_field(removed)) - 1
+    new_count = F('reviews_count') + count_delta
+    new_sum = F('score_sum') + score_delta
+    Title.objects.filter(pk=title_id).update(
+        version=F('version') + 1,
+        modified=timezone.now(),
+        score_sum=new_sum,
+        reviews_count=new_count,
+        rating=Case(
+            When(
+                Q(reviews_count__gt=-count_delta),
+                then=Cast(new_sum, FloatField()) / new_count
+            ),
+            default=Value(None),
+            output_field=FloatField()
+        ),
+        **histogram
+    )
+    refresh_leaderboards([title_id])
+
+
+def refresh_leaderboards(title_ids):
+    """Переносит рейтинг произведений в их строки таблиц лидеров."""
+    title = Title.objects.filter(pk=OuterRef('title_id'))
+    for model in LEADERBOARDS:
+        model.objects.filter(title_id__in=title_ids).update(
+            rating=Subquery(title.values('rating')[:1]),
+            reviews_count=Subquery(title.values('reviews_count')[:1])
+        )
+
+
+def top_title_ids(limit, category_id=None, genre_id=None):
+    """
+    id лучших по рейтингу произведений категории, жанра или всего
+    каталога. Читается первые limit записей индекса таблицы лидеров,
+    поэтому время не зависит ни от числа отзывов, ни от размера подборки.
+    """
+    if category_id is not None:
+        entries = CategoryLeaderboard.objects.filter(category_id=category_id)
+    elif genre_id is not None:
+        entries = GenreLeaderboard.objects.filter(genre_id=genre_id)
+    else:
+        entries = Title.objects.annotate(title_id=F('id'))
+    return list(entries.order_by(
+        F('rating').desc(nulls_last=True), '-title_id'
+    ).values_list('title_id', flat=True)[:limit])
+
+
+def sync_category_leaderboard(sender, instance, **kwargs):
+    """
+    Обработчик post_save произведения: переносит его строку в таблицу
+    лидеров текущей категории.
+    """
+    CategoryLeaderboard.objects.filter(title_id=instance.pk).exclude(
+        category_id=instance.category_id
+    ).delete()
+    if instance.category_id is not None:
+        CategoryLeaderboard.objects.update_or_create(
+            title_id=instance.pk,
+            defaults={
+                'category_id': instance.category_id,
+                'rating': instance.rating,
+                'reviews_count': instance.reviews_count,
+            }
+        )
+
+
+def sync_genre_leaderboard(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """
+    Обработчик m2m_changed жанров произведения: пересобирает строки
+    таблицы лидеров жанров для затронутых произведений.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        title_ids = [instance.pk]
+    elif action == 'post_clear':
+        GenreLeaderboard.objects.filter(genre_id=instance.pk).delete()
+        return
+    else:
+        title_ids = pk_set
+    GenreLeaderboard.objects.filter(title_id__in=title_ids).delete()
+    links = Title.genre.through.objects.filter(
+        title_id__in=title_ids
+    ).values_list('title_id', 'genre_id', 'title__rating',
+                  'title__reviews_count')
+    GenreLeaderboard.objects.bulk_create(
+        GenreLeaderboard(
+            title_id=title_id, genre_id=genre_id, rating=rating,
+            reviews_count=reviews_count
+        )
+        for title_id, genre_id, rating, reviews_count in links
+    )
+
+
+@transaction.atomic
+def rebuild_leaderboards():
+    """
+    Заново заполняет таблицы лидеров из произведений одним
+    INSERT ... SELECT на таблицу. Возвращает количество строк.
+    """
+    title_table = Title._meta.db_table
+    link_table = Title.genre.through._meta.db_table
+    statements = (
+        (CategoryLeaderboard, 'category_id', (
+            f'SELECT id, category_id, rating, reviews_count '
+            f'FROM {title_table} WHERE category_id IS NOT NULL'
+        )),
+        (GenreLeaderboard, 'genre_id', (
+            f'SELECT title.id, link.genre_id, title.rating, '
+            f'title.reviews_count FROM {link_table} link '
+            f'JOIN {title_table} title ON title.id = link.title_id'
+        )),
+    )
+    total = 0
+    with connection.cursor() as cursor:
+        for model, group_column, select in statements:
+            model.objects.all().delete()
+            cursor.execute(
+                f'INSERT INTO {model._meta.db_table} '
+                f'(title_id, {group_column}, rating, reviews_count) {select}'
+            )
+            total += cursor.rowcount
+    return total
+
+
+@transaction.atomic
+def bulk_create_titles(titles, genre_ids, batch_size=None):
+    """
+    Сохраняет новые произведения, их жанры и строки таблиц лидеров
+    пакетными INSERT в одной транзакции.
+
+    genre_ids — списки id жанров в порядке titles. bulk_create не
+    отправляет сигналы, поэтому таблицы лидеров заполняются здесь же.
+    Возвращает titles с проставленными id.
+    """
+    Title.objects.bulk_create(titles, batch_size=batch_size)
+    if titles and titles[0].pk is None:
+        # SQLite не возвращает id из bulk_create, но строки одной
+        # транзакции получают подряд идущие id: запись в базу
+        # заблокирована для остальных до её конца.
+        pks = list(Title.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(titles)])
+        for title, pk in zip(titles, reversed(pks)):
+            title.pk = pk
+    links = [
+        Title.genre.through(title_id=title.pk, genre_id=genre_id)
+        for title, title_genres in zip(titles, genre_ids)
+        for genre_id in title_genres
+    ]
+    Title.genre.through.objects.bulk_create(links, batch_size=batch_size)
+    CategoryLeaderboard.objects.bulk_create((
+        CategoryLeaderboard(
+            title_id=title.pk, category_id=title.category_id,
+            rating=title.rating, reviews_count=title.reviews_count
+        )
+        for title in titles if title.category_id is not None
+    ), batch_size=batch_size)
+    GenreLeaderboard.objects.bulk_create((
+        GenreLeaderboard(
+            title_id=link.title_id, genre_id=link.genre_id,
+            rating=None, reviews_count=0
+        )
+        for link in links
+    ), batch_size=batch_size)
+    return titles
+
+
+def touch_titles(**filters):
+    """Сдвигает версии произведений после изменения их данных."""
+    Title.objects.filter(**filters).update(
+        version=F('version') + 1, modified=timezone.now()
+    )
+
+
+def touch_related_titles(sender, instance, **kwargs):
+    """
+    Обработчик post_save и pre_delete категорий и жанров: их названия
+    входят в ответ о произведении.
+    """
+    touch_titles(pk__in=instance.titles.values('pk'))
+
+
+def touch_reviews(**filters):
+    """Сдвигает версии отзывов после изменения их самих или комментариев."""
+    Review.objects.filter(**filters).update(
+        version=F('version') + 1, modified=timezone.now()
+    )
+
+
+def touch_author_content(sender, instance, **kwargs):
+    """
+    Обработчик post_save пользователя: логин автора входит в списки
+    отзывов и комментариев, поэтому при его смене сдвигаются версии
+    произведений с его отзывами и отзывов с его комментариями.
+    """
+    if not getattr(instance, 'renamed', False):
+        return
+    touch_titles(pk__in=instance.reviews.values('title_id'))
+    touch_reviews(author=instance)
+    touch_reviews(pk__in=instance.comments.values('review_id'))
+
+
+def prepare_author_removal(author):
+    """
+    Вычитает оценки автора из рейтингов перед удалением его отзывов
+    и сдвигает версии отзывов, из которых пропадут его комментарии.
+    """
+    touch_reviews(pk__in=author.comments.values('review_id'))
+    scores = Review.objects.filter(author=author).values_list(
+        'title_id', 'score'
+    )
+    for title_id, score in scores:
+        update_title_rating(title_id, removed=score)
+
+
+def calculate_histograms(title_ids):
+    """
+    Считает по отзывам количество каждой оценки для набора произведений:
+    {id произведения: {оценка: количество}}.
+    """
+    counts = (
+        Review.objects.filter(title_id__in=title_ids)
+        .order_by()
+        .values_list('title_id', 'score')
+        .annotate(count=Count('id'))
+    )
+    histograms = {}
+    for title_id, score, count in counts:
+        histograms.setdefault(title_id, {})[score] = count
+    return histograms
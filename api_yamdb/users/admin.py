@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -16,4 +16,16 @@ class UserAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject',
+                    'recipients',
+                    'created',
+                    'attempts',
+                    'sent',
+                    'last_error',)
+    search_fields = ('recipients',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(User, UserAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from .authentication import invalidate_cached_user
+
+        user_model = self.get_model('User')
+        post_save.connect(invalidate_cached_user, sender=user_model)
+        post_delete.connect(invalidate_cached_user, sender=user_model)
@@ -0,0 +1,191 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'token_version')
+
+
+class UserCache:
+    """
+    Ограниченный LRU-кэш пользователей по id со временем жизни записей.
+
+    Кэш живёт в памяти процесса: сигналы сбрасывают записи только в том
+    процессе, где пользователь изменён, в остальных изменения станут
+    видны не позже чем через ttl секунд.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.entries[key] = (user, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 60),
+)
+
+
+def token_version_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def get_token_version(user_id):
+    """
+    Текущая версия токенов пользователя или None, если он удалён
+    или неактивен. Значение хранится в общем кэше, строка пользователя
+    целиком не читается.
+    """
+    key = token_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).values_list('token_version', flat=True).first()
+        cache.set(key, -1 if version is None else version,
+                  getattr(settings, 'USER_CACHE_TTL', 60))
+    return None if version == -1 else version
+
+
+def revoke_tokens(user):
+    """Отзывает все выданные пользователю токены."""
+    get_user_model().objects.filter(pk=user.pk).update(
+        token_version=F('token_version') + 1
+    )
+    cache.delete(token_version_key(user.pk))
+
+
+def issue_access_token(user):
+    """
+    Выдаёт access-токен. При JWT_ROLE_CLAIMS = True в него записываются
+    имя, роль и версия токенов, и права проверяются без чтения
+    пользователя из базы.
+    """
+    token = AccessToken.for_user(user)
+    if getattr(settings, 'JWT_ROLE_CLAIMS', False):
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+    return token
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Пользователь, собранный из утверждений токена.
+
+    Роль, имя и id берутся из токена; при обращении к любому другому
+    атрибуту или при передаче в ORM строка пользователя загружается,
+    как у request.user в django.contrib.auth.
+    """
+
+    def __init__(self, user_id, claims, load_user):
+        self.__dict__['_claims'] = dict(claims, id=user_id, pk=user_id)
+        super().__init__(lambda: load_user(user_id))
+
+    def __getattr__(self, name):
+        if self._wrapped is empty and name in self._claims:
+            return self._claims[name]
+        return super().__getattr__(name)
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.role == get_user_model().ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == get_user_model().MODERATOR
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication, берущая пользователя из user_cache.
+
+    Каждый запрос получает свою копию объекта, чтобы изменения
+    в представлении не попадали в общий кэш. Для токенов с ролью
+    возвращается ClaimsUser после сверки версии токенов.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None and all(
+            field in validated_token for field in CLAIM_FIELDS
+        ):
+            if get_token_version(user_id) != validated_token['token_version']:
+                raise AuthenticationFailed(
+                    'Токен отозван.', code='token_revoked'
+                )
+            return ClaimsUser(
+                user_id,
+                {field: validated_token[field] for field in CLAIM_FIELDS},
+                lambda pk: self.load_user(pk, validated_token)
+            )
+        return self.load_user(user_id, validated_token)
+
+    def load_user(self, user_id, validated_token):
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return copy.copy(user)
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Обработчик post_save и post_delete пользователя: сбрасывает его
+    в user_cache и версию токенов в общем кэше.
+
+    Запись сбрасывается сразу и ещё раз после фиксации транзакции, чтобы
+    параллельный запрос не успел положить в кэш старую версию строки.
+    """
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    user_cache.invalidate(user_id)
+    cache.delete(token_version_key(user_id))
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
+    transaction.on_commit(lambda: cache.delete(token_version_key(user_id)))
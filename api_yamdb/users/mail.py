@@ -0,0 +1,118 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)
+RETRY_DELAY = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=1)
+MAX_ATTEMPTS = 8
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """
+    Ставит письмо в очередь и сразу возвращает управление.
+
+    Письмо сохраняется в базе в текущей транзакции. Его отправляет команда
+    mail_worker; при EMAIL_OUTBOX_ASYNC = False письмо отправляется сразу
+    после фиксации транзакции, а при ошибке остаётся в очереди.
+    """
+    email = OutgoingEmail.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        recipients='\n'.join(recipient_list)
+    )
+    if not getattr(settings, 'EMAIL_OUTBOX_ASYNC', True):
+        transaction.on_commit(lambda: send_pending(ids=[email.pk]))
+    return email
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: растёт вдвое с каждой неудачей."""
+    return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def claim_pending(batch_size, max_attempts=MAX_ATTEMPTS, ids=None):
+    """
+    Забирает порцию писем, которым пора уходить.
+
+    Письма получают аренду: следующая попытка сдвигается на LEASE вперёд,
+    так что другой обработчик их не возьмёт, а после падения процесса
+    они вернутся в очередь сами.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = OutgoingEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            sent__isnull=True, next_attempt__lte=now,
+            attempts__lt=max_attempts
+        )
+        if ids is not None:
+            pending = pending.filter(pk__in=ids)
+        emails = list(pending.order_by('next_attempt', 'id')[:batch_size])
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(attempts=F('attempts') + 1, next_attempt=now + LEASE)
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def deliver(emails, connection):
+    """Отправляет письма через одно соединение и отмечает результат."""
+    sent = 0
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject, body=email.body,
+            from_email=email.from_email,
+            to=email.recipients.splitlines(), connection=connection
+        )
+        try:
+            message.send()
+        except Exception as error:
+            logger.warning('Письмо %s не отправлено: %s', email.pk, error)
+            OutgoingEmail.objects.filter(pk=email.pk).update(
+                next_attempt=timezone.now() + retry_delay(email.attempts),
+                last_error=str(error)
+            )
+            continue
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            sent=timezone.now(), last_error=''
+        )
+        sent += 1
+    return sent
+
+
+def send_pending(batch_size=100, max_attempts=MAX_ATTEMPTS, ids=None,
+                 connection=None):
+    """
+    Отправляет письма из очереди, пока есть готовые к отправке.
+
+    Все порции уходят через одно соединение с почтовым сервером.
+    Возвращает пару: отправлено и обработано писем.
+    """
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning('Почтовый сервер недоступен: %s', error)
+        return 0, 0
+    sent = processed = 0
+    try:
+        while True:
+            emails = claim_pending(batch_size, max_attempts, ids)
+            if not emails:
+                break
+            sent += deliver(emails, connection)
+            processed += len(emails)
+    finally:
+        connection.close()
+    return sent, processed
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.mail import MAX_ATTEMPTS, send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди порциями через одно соединение '
+        'с почтовым сервером. Неудачные попытки повторяются с растущей '
+        'паузой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем, забираемых из очереди за раз.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах между проверками пустой очереди.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=MAX_ATTEMPTS,
+            help='После стольких неудач письмо больше не отправляется.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь один раз и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['max_attempts'] < 1:
+            raise CommandError(
+                '--batch-size и --max-attempts должны быть больше нуля.'
+            )
+        while True:
+            sent, processed = send_pending(
+                options['batch_size'], options['max_attempts']
+            )
+            if processed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {processed - sent}.'
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,76 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE users_user_trigram USING fts5(
+        username, content='users_user', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER users_user_trigram_insert AFTER INSERT ON users_user
+    BEGIN
+        INSERT INTO users_user_trigram (rowid, username)
+        VALUES (new.id, new.username);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_trigram_delete AFTER DELETE ON users_user
+    BEGIN
+        INSERT INTO users_user_trigram (users_user_trigram, rowid, username)
+        VALUES ('delete', old.id, old.username);
+    END
+    """,
+    """
+    CREATE TRIGGER users_user_trigram_update
+    AFTER UPDATE OF username ON users_user
+    BEGIN
+        INSERT INTO users_user_trigram (users_user_trigram, rowid, username)
+        VALUES ('delete', old.id, old.username);
+        INSERT INTO users_user_trigram (rowid, username)
+        VALUES (new.id, new.username);
+    END
+    """,
+    "INSERT INTO users_user_trigram (users_user_trigram) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS users_user_trigram_insert',
+    'DROP TRIGGER IF EXISTS users_user_trigram_delete',
+    'DROP TRIGGER IF EXISTS users_user_trigram_update',
+    'DROP TABLE IF EXISTS users_user_trigram',
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    Создаёт триграммный индекс логинов (FTS5, токенизатор trigram,
+    SQLite 3.34+). Без него поиск по подстроке идёт через icontains.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_SQL[0])
+    except OperationalError:
+        return
+    for sql in CREATE_SQL[1:]:
+        schema_editor.execute(sql)
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
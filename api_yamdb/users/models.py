@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -45,11 +46,66 @@ class User(AbstractUser):
                             choices=USER_ROLE,
                             default=USER,
                             help_text='Пользователь')
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        help_text='Увеличение отзывает выданные токены'
+    )
+
+    CLAIM_FIELDS = ('role', 'is_staff')
 
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._saved_claims = user.get_claims()
+        user._saved_username = user.__dict__.get('username')
+        return user
+
+    def get_claims(self):
+        """
+        Роль и is_staff, записываемые в токен, или None, если поля
+        не загружены.
+        """
+        if not all(name in self.__dict__ for name in self.CLAIM_FIELDS):
+            return None
+        return tuple(self.__dict__[name] for name in self.CLAIM_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """
+        При смене роли отзывает токены, в которых записана старая.
+
+        Роль сравнивается со значениями, загруженными из базы или
+        записанными прошлым save(), без лишнего запроса. Так же
+        определяется смена логина: renamed видят обработчики post_save.
+        """
+        claims = self.get_claims()
+        saved = getattr(self, '_saved_claims', None)
+        update_fields = kwargs.get('update_fields')
+        username = self.__dict__.get('username')
+        saved_username = getattr(self, '_saved_username', None)
+        self.renamed = (
+            update_fields is None or 'username' in update_fields
+        ) and None not in (saved_username, username) and (
+            saved_username != username
+        )
+        if self.pk is not None and None not in (saved, claims) and (
+            saved != claims
+        ):
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        if update_fields is None or set(self.CLAIM_FIELDS) <= set(
+            update_fields
+        ):
+            self._saved_claims = claims
+        if update_fields is None or 'username' in update_fields:
+            self._saved_username = username
+
     @property
     def is_admin(self):
         return self.is_staff or self.role == User.ADMIN
@@ -60,3 +116,34 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.TextField(
+        'Получатели', help_text='По одному адресу в строке'
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt', 'id'],
+                condition=models.Q(sent__isnull=True),
+                name='outgoing_email_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,32 @@
+TRIGRAM_TABLE = 'users_user_trigram'
+
+TRIGRAM_TRIGGERS = {
+    'users_user_trigram_insert': """
+        CREATE TRIGGER IF NOT EXISTS users_user_trigram_insert
+        AFTER INSERT ON users_user
+        BEGIN
+            INSERT INTO users_user_trigram (rowid, username)
+            VALUES (new.id, new.username);
+        END
+    """,
+    'users_user_trigram_delete': """
+        CREATE TRIGGER IF NOT EXISTS users_user_trigram_delete
+        AFTER DELETE ON users_user
+        BEGIN
+            INSERT INTO users_user_trigram (users_user_trigram, rowid,
+                                            username)
+            VALUES ('delete', old.id, old.username);
+        END
+    """,
+    'users_user_trigram_update': """
+        CREATE TRIGGER IF NOT EXISTS users_user_trigram_update
+        AFTER UPDATE OF username ON users_user
+        BEGIN
+            INSERT INTO users_user_trigram (users_user_trigram, rowid,
+                                            username)
+            VALUES ('delete', old.id, old.username);
+            INSERT INTO users_user_trigram (rowid, username)
+            VALUES (new.id, new.username);
+        END
+    """,
+}
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,4 +33,20 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш процесса переживает очистку тестовой базы между тестами."""
+    from django.core.cache import cache
+    from users.authentication import user_cache
+    cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def inline_email(settings):
+    """Тесты ждут письмо в mail.outbox сразу после запроса."""
+    settings.EMAIL_OUTBOX_ASYNC = False
@@ -0,0 +1,49 @@
+import pytest
+from reviews.models import Category, Comments, Genre, Review, Title
+
+CATALOGUE_SIZE = 200
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def title(category):
+    return Title.objects.create(name='Произведение', year=2000,
+                                category=category)
+
+
+@pytest.fixture
+def review(admin, title):
+    return Review.objects.create(author=admin, title=title, text='Отзыв',
+                                 score=5)
+
+
+@pytest.fixture
+def comment(admin, review):
+    return Comments.objects.create(author=admin, review=review,
+                                   text='Комментарий')
+
+
+@pytest.fixture
+def catalogue():
+    """
+    Произведения двух категорий и двух жанров за 20 лет. Слаги Films
+    и Drama записаны с заглавной буквы для проверки нормализации.
+    """
+    films = Category.objects.create(name='Фильм', slug='Films')
+    books = Category.objects.create(name='Книга', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='Drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=1990 + idx % 20,
+              category=(films, books)[idx % 2])
+        for idx in range(CATALOGUE_SIZE)
+    )
+    through = Title.genre.through
+    through.objects.bulk_create(
+        through(title_id=title_id, genre_id=(drama, comedy)[title_id % 2].id)
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
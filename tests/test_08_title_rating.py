@@ -0,0 +1,133 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from api.serializers import ReviewSerializer
+from api.views import ReviewViewSet
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, Title
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_title(self, title_id):
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user, user_client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отлично', 10)
+
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.reviews_count) == (15, 2), (
+            'Проверьте, что при создании отзыва в произведении обновляются '
+            'сумма и количество оценок.'
+        )
+        assert title.rating == 7.5
+
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 1}
+        )
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.reviews_count) == (11, 2), (
+            'Проверьте, что при изменении оценки отзыва обновляется '
+            'сумма оценок произведения.'
+        )
+        assert title.rating == 5.5
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.reviews_count) == (10, 1)
+        assert title.rating == 10, (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг.'
+        )
+
+    def test_02_rating_reset_on_author_delete(self, admin_client, admin,
+                                              user, user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        title_id = titles[0]['id']
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        title = self.get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из рейтинга произведений.'
+        )
+
+    def test_03_rating_read_without_aggregation(self, admin_client, admin,
+                                                client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 5
+        assert not any(
+            'reviews_review' in query['sql'] for query in context
+        ), (
+            'Проверьте, что рейтинг произведения читается из сохранённого '
+            'поля без обращения к таблице отзывов.'
+        )
+
+    def test_04_rebuild_ratings_command(self, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(score_sum=0, reviews_count=0, rating=None)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+        call_command('rebuild_ratings', '--chunk-size=1', stdout=StringIO())
+        title = self.get_title(titles[0]['id'])
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            5, 1, 5
+        ), (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'сохранённые значения рейтинга.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_05_concurrent_review_delete(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        stale = Review.objects.get(pk=reviews[0]['id'])
+
+        assert admin_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        # Второй DELETE, получивший отзыв до удаления первым запросом.
+        ReviewViewSet().perform_destroy(stale)
+        assert admin_client.delete(url).status_code == HTTPStatus.NOT_FOUND
+
+        title = self.get_title(titles[0]['id'])
+        assert (
+            title.score_sum, title.reviews_count, title.score_5_count
+        ) == (0, 0, 0), (
+            'Проверьте, что повторное удаление отзыва не вычитает его '
+            'оценку из рейтинга дважды.'
+        )
+
+    def test_06_update_reads_current_score(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        stale = Review.objects.get(pk=reviews[0]['id'])
+        admin_client.patch(url, data={'score': 9})
+
+        serializer = ReviewSerializer(stale, data={'score': 7}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        ReviewViewSet().perform_update(serializer)
+
+        title = self.get_title(titles[0]['id'])
+        assert (
+            title.score_sum, title.reviews_count, title.score_9_count,
+            title.score_7_count
+        ) == (7, 1, 0, 1), (
+            'Проверьте, что при изменении отзыва старая оценка читается '
+            'из базы, а не из загруженного ранее объекта.'
+        )
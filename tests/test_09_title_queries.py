@@ -0,0 +1,49 @@
+import pytest
+from reviews.models import Genre, Title
+
+TITLES_COUNT = 500
+
+
+@pytest.fixture
+def first_title(category):
+    """Первое из TITLES_COUNT произведений с двумя жанрами каждое."""
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(3)
+    )
+    genres = list(Genre.objects.order_by('id'))
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(TITLES_COUNT)
+    )
+    through = Title.genre.through
+    through.objects.bulk_create(
+        through(title_id=title_id, genre_id=genre.id)
+        for title_id in Title.objects.values_list('id', flat=True)
+        for genre in genres[:2]
+    )
+    return Title.objects.order_by('id').first()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('limit', (1, 10, TITLES_COUNT))
+    def test_01_title_list_query_count(self, client, first_title, limit,
+                                       django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(
+            len(title['genre']) == 2 and title['category'] for title in results
+        ), (
+            'Проверьте, что при GET-запросе к `/api/v1/titles/` для каждого '
+            'произведения возвращаются категория и жанры.'
+        )
+
+    def test_02_title_detail_query_count(self, client, first_title,
+                                         django_assert_num_queries):
+        # Версия для ETag, произведение с категорией и жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{first_title.id}/')
+        assert response.json()['category']['slug'] == 'films'
@@ -0,0 +1,111 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.importing import dependency_order, read_slice, record_ranges
+from reviews.models import Category, Comments, Genre, Review, Title
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadCsv:
+
+    def test_00_dependency_order(self):
+        order = dependency_order(
+            [Comments, Review, Title.genre.through, Title, Genre, Category,
+             User]
+        )
+        assert order.index(Category) < order.index(Title)
+        assert order.index(Title) < order.index(Title.genre.through)
+        assert order.index(Genre) < order.index(Title.genre.through)
+        assert order.index(User) < order.index(Review) < order.index(
+            Comments
+        ), (
+            'Проверьте, что файлы загружаются после файлов моделей, '
+            'на которые они ссылаются.'
+        )
+
+    @pytest.mark.parametrize('workers', (1, 2))
+    def test_01_load_static_data(self, workers):
+        out = StringIO()
+        call_command(
+            'load_csv', '--chunk-size=200', f'--workers={workers}', stdout=out
+        )
+
+        expected = {
+            User: 5, Category: 3, Genre: 15, Title: 32,
+            Title.genre.through: 42, Review: 72, Comments: 3,
+        }
+        for model, count in expected.items():
+            assert model.objects.count() == count, (
+                'Проверьте, что команда `load_csv` загружает все строки '
+                f'файла для модели `{model.__name__}`.'
+            )
+        assert 'строк/с' in out.getvalue()
+
+        review = Review.objects.get(pk=1)
+        assert review.author.username == 'bingobongo'
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что `load_csv` сохраняет дату публикации из файла.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_02_unknown_foreign_key(self, tmp_path):
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм,1994,42\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match='category=42'):
+            call_command(
+                'load_csv', 'titles.csv', f'--path={tmp_path}',
+                '--workers=1', stdout=StringIO()
+            )
+        assert not Title.objects.exists()
+
+    def test_03_invalid_value(self, tmp_path):
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n2,Книга,:-)\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError, match='запись 2, поле slug'):
+            call_command(
+                'load_csv', 'category.csv', f'--path={tmp_path}',
+                '--workers=2', stdout=StringIO()
+            )
+        assert not Category.objects.exists(), (
+            'Проверьте, что файл с ошибкой в данных не загружается частично.'
+        )
+
+    def test_04_repeated_load(self, tmp_path):
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n1,Фильм,movie\n', encoding='utf-8'
+        )
+        args = ('load_csv', 'category.csv', f'--path={tmp_path}',
+                '--workers=1')
+        call_command(*args, stdout=StringIO())
+        with pytest.raises(CommandError, match='category.csv'):
+            call_command(*args, stdout=StringIO())
+        assert Category.objects.count() == 1, (
+            'Проверьте, что повторная загрузка в непустую таблицу '
+            'завершается ошибкой команды, а не исключением базы.'
+        )
+
+    def test_05_record_ranges(self, tmp_path):
+        path = tmp_path / 'review.csv'
+        path.write_text(
+            'id,text\n1,"первая\nстрока, ""в кавычках"""\n2,вторая\r\n'
+            '3,"\n"\n4,последняя',
+            encoding='utf-8', newline=''
+        )
+        for size in (1, 5, 20, 1000):
+            ranges = list(record_ranges(path, size))
+            rows = [
+                row for start, end in ranges
+                for row in read_slice(path, start, end)
+            ]
+            assert rows == [
+                ['id', 'text'], ['1', 'первая\nстрока, "в кавычках"'],
+                ['2', 'вторая'], ['3', '\n'], ['4', 'последняя'],
+            ], (
+                'Проверьте, что файл делится на куски только по границам '
+                'записей.'
+            )
+            assert ranges[0] == (0, len('id,text\n'))
@@ -0,0 +1,173 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comments, Review, Title
+from users.models import User
+
+from tests.utils import create_titles
+
+REVIEWS_COUNT = 25
+
+
+@pytest.fixture
+def title_reviews(admin_client):
+    titles, _, _ = create_titles(admin_client)
+    User.objects.bulk_create(
+        User(username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+        for idx in range(REVIEWS_COUNT)
+    )
+    Review.objects.bulk_create(
+        Review(title_id=titles[0]['id'], author=author, text='Отзыв', score=5)
+        for author in User.objects.filter(username__startswith='author')
+    )
+    return titles[0]['id']
+
+
+def title_sort_key(ordering):
+    """
+    Ключ сортировки, где NULL в рейтинге меньше любой оценки, а id
+    идёт в направлении первого поля.
+    """
+    name = ordering.lstrip('-')
+    sign = -1 if ordering.startswith('-') else 1
+
+    def key(title):
+        value = getattr(title, name)
+        if name == 'rating':
+            value = (sign if value is not None else -sign, sign * (value or 0))
+        return value, sign * title.id
+
+    return key
+
+
+def walk(client, url, link='next'):
+    ids, requests = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсоров не выполняется подсчёт '
+            'общего количества объектов.'
+        )
+        ids.extend(item['id'] for item in data['results'])
+        url, requests = data[link], requests + 1
+    return ids, requests
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11KeysetPagination:
+
+    def test_01_review_cursor_walk(self, client, title_reviews):
+        url = f'/api/v1/titles/{title_reviews}/reviews/'
+        ids, requests = walk(client, f'{url}?cursor=&limit=10')
+        expected = list(
+            Review.objects.filter(title_id=title_reviews)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert ids == expected, (
+            'Проверьте, что переход по ссылкам `next` в режиме курсоров '
+            'возвращает все отзывы без пропусков и повторов.'
+        )
+        assert requests == 3
+
+        last_page = client.get(f'{url}?cursor=&limit=10').json()
+        for _ in range(2):
+            last_page = client.get(last_page['next']).json()
+        previous_ids, _ = walk(client, last_page['previous'], 'previous')
+        assert sorted(previous_ids) == sorted(expected[:20]), (
+            'Проверьте, что ссылка `previous` в режиме курсоров ведёт '
+            'на предыдущие страницы.'
+        )
+
+    def test_02_deep_page_costs_like_first(self, client, title_reviews):
+        url = f'/api/v1/titles/{title_reviews}/reviews/?cursor=&limit=5'
+        with CaptureQueriesContext(connection) as first_page:
+            page = client.get(url).json()
+        for _ in range(3):
+            page = client.get(page['next']).json()
+        with CaptureQueriesContext(connection) as deep_page:
+            client.get(page['next'])
+        assert len(deep_page) == len(first_page), (
+            'Проверьте, что глубокая страница в режиме курсоров стоит '
+            'столько же запросов, сколько первая.'
+        )
+        assert 'OFFSET' not in deep_page.captured_queries[-1]['sql']
+
+    def test_03_comments_and_limit_offset(self, client, admin,
+                                          title_reviews):
+        review = Review.objects.first()
+        Comments.objects.bulk_create(
+            Comments(review=review, author=admin, text=f'Комментарий {idx}')
+            for idx in range(3)
+        )
+        url = (
+            f'/api/v1/titles/{title_reviews}/reviews/{review.id}/comments/'
+        )
+        ids, _ = walk(client, f'{url}?cursor=&limit=2')
+        assert len(set(ids)) == 3
+
+        data = client.get(f'{url}?limit=2&offset=2').json()
+        assert data['count'] == 3 and len(data['results']) == 1, (
+            'Проверьте, что пагинация limit/offset продолжает работать.'
+        )
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('ordering', ('-rating', 'rating', 'year', 'name'))
+    def test_04_title_cursor_walk(self, client, category, ordering):
+        Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {idx % 7}', year=1990 + idx % 3,
+                category=category,
+                rating=None if idx % 4 == 0 else float(idx % 5)
+            )
+            for idx in range(40)
+        )
+        url = f'/api/v1/titles/?cursor=&limit=6&ordering={ordering}'
+        ids, _ = walk(client, url)
+        expected = sorted(Title.objects.all(), key=title_sort_key(ordering))
+        assert ids == [title.id for title in expected], (
+            'Проверьте, что режим курсоров для `/api/v1/titles/` '
+            'учитывает параметр `ordering` без пропусков и повторов.'
+        )
+
+        filtered_ids, _ = walk(client, f'{url}&year=1991')
+        assert filtered_ids == [
+            title.id for title in expected if title.year == 1991
+        ], (
+            'Проверьте, что режим курсоров совместим с фильтрами '
+            '`/api/v1/titles/`.'
+        )
+
+        page = client.get(url).json()
+        page = client.get(page['next']).json()
+        previous = client.get(page['previous']).json()
+        assert [item['id'] for item in previous['results']] == ids[:6]
+
+    def test_05_user_cursor_walk(self, admin_client, admin):
+        User.objects.bulk_create(
+            User(username=f'user{idx:02}', email=f'user{idx}@yamdb.fake')
+            for idx in range(12)
+        )
+        url = '/api/v1/users/?cursor=&limit=5'
+        usernames = []
+        while url:
+            data = admin_client.get(url).json()
+            usernames.extend(item['username'] for item in data['results'])
+            url = data['next']
+        assert usernames == list(
+            User.objects.order_by('id').values_list('username', flat=True)
+        ), (
+            'Проверьте, что `/api/v1/users/` поддерживает режим курсоров '
+            'с сортировкой по `id`.'
+        )
+
+        data = admin_client.get(
+            '/api/v1/users/?cursor=&limit=3&search=user1'
+        ).json()
+        assert [item['username'] for item in data['results']] == [
+            'user10', 'user11'
+        ]
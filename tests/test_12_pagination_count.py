@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Title
+
+from tests.utils import create_reviews
+
+
+@pytest.fixture
+def categories():
+    Category.objects.bulk_create(
+        Category(name=f'Категория {idx}', slug=f'category-{idx}')
+        for idx in range(5)
+    )
+
+
+def count_queries(context):
+    return [
+        query for query in context.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12PaginationCount:
+
+    def test_01_exact_count_by_default(self, client, categories):
+        data = client.get('/api/v1/categories/?limit=2').json()
+        assert data['count'] == 5 and data['count_exact'] is True, (
+            'Проверьте, что по умолчанию ответ содержит точное количество '
+            'и признак `count_exact`.'
+        )
+
+    def test_02_count_omitted(self, client, categories):
+        url = '/api/v1/categories/?limit=2&count=none'
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+        assert 'count' not in data and not count_queries(context), (
+            'Проверьте, что при `count=none` количество не считается и не '
+            'возвращается.'
+        )
+        assert len(data['results']) == 2
+        assert data['next']
+
+        data = client.get(f'{url}&offset=4').json()
+        assert len(data['results']) == 1 and data['next'] is None
+
+    def test_03_cached_count(self, client, categories):
+        url = '/api/v1/categories/?count=cached'
+        data = client.get(url).json()
+        assert (data['count'], data['count_exact']) == (5, True)
+
+        Category.objects.create(name='Новая', slug='new')
+        data = client.get(url).json()
+        assert (data['count'], data['count_exact']) == (5, False), (
+            'Проверьте, что при `count=cached` количество берётся из кэша '
+            'и помечается как неточное.'
+        )
+        assert len(data['results']) == 6
+
+    def test_04_estimated_review_count(self, client, admin_client, admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.filter(pk=titles[0]['id']).update(reviews_count=7)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?count=estimate'
+        with CaptureQueriesContext(connection) as context:
+            data = client.get(url).json()
+        assert (data['count'], data['count_exact']) == (7, False), (
+            'Проверьте, что при `count=estimate` количество отзывов '
+            'берётся из счётчика произведения.'
+        )
+        assert not count_queries(context)
+
+    @pytest.mark.parametrize('mode', ('cached', 'estimate'))
+    def test_05_empty_filter_count(self, client, categories, mode):
+        response = client.get(f'/api/v1/titles/?category=nope&count={mode}')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что неизвестное значение фильтра не ломает '
+            f'подсчёт в режиме `count={mode}`.'
+        )
+        data = response.json()
+        assert (data['count'], data['results']) == (0, [])
@@ -0,0 +1,123 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    def test_01_genre_list_cache(self, client, admin_client,
+                                 django_assert_num_queries):
+        url = '/api/v1/genres/?search=Ужасы'
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Ужасы', 'slug': 'horror'
+        })
+        assert client.get(url).json()['count'] == 1
+        with django_assert_num_queries(0):
+            response = admin_client.get(url)
+        assert response.json()['results'] == [
+            {'name': 'Ужасы', 'slug': 'horror'}
+        ], (
+            'Проверьте, что повторный запрос списка жанров отдаётся из кэша '
+            'без обращения к базе данных.'
+        )
+
+        admin_client.delete('/api/v1/genres/horror/')
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что после удаления жанра кэш списка сбрасывается.'
+        )
+
+    def test_02_review_list_etag(self, client, admin_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified'], (
+            'Проверьте, что список отзывов отдаётся с заголовками ETag '
+            'и Last-Modified.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении If-None-Match возвращается 304.'
+        )
+        assert response['ETag'] == etag
+
+        admin_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag списка меняется.'
+        )
+        assert response['ETag'] != etag
+        assert len(response.json()['results']) == 1
+
+    def test_03_title_detail_if_modified_since(self, client, admin_client,
+                                               title):
+        url = f'/api/v1/titles/{title.id}/'
+        last_modified = client.get(url)['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при If-Modified-Since не раньше даты изменения '
+            'произведения возвращается 304.'
+        )
+        etag = response['ETag']
+        admin_client.patch(url, data={'name': 'Новое название'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения произведения ETag меняется.'
+        )
+        assert response.json()['name'] == 'Новое название'
+
+    def test_04_title_etag_after_direct_changes(self, client, admin_client,
+                                                title):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+
+        title.name = 'Изменено в админке'
+        title.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag меняется и после `save()` в обход API.'
+        )
+        assert response.json()['name'] == 'Изменено в админке'
+
+        etag = response['ETag']
+        Title.objects.filter(pk=title.pk).update(rating=3)
+        call_command('rebuild_ratings', stdout=StringIO())
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `rebuild_ratings` меняет ETag исправленных '
+            'произведений.'
+        )
+        assert response.json()['rating'] is None
+
+    def test_05_invalid_id(self, client, title):
+        for url in ('/api/v1/titles/abc/',
+                    f'/api/v1/titles/{title.id}/reviews/abc/'):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что запрос объекта с нечисловым id '
+                'возвращает статус 404.'
+            )
+
+    def test_06_etag_after_author_rename(self, client, admin_client,
+                                         comment):
+        review = comment.review
+        urls = (
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+            '/comments/',
+        )
+        etags = [client.get(url)['ETag'] for url in urls]
+        admin_client.patch(
+            f'/api/v1/users/{review.author.username}/',
+            data={'username': 'RenamedAdmin'}
+        )
+        for url, etag in zip(urls, etags):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что смена логина автора меняет ETag отзывов '
+                'и комментариев.'
+            )
+            assert 'RenamedAdmin' in response.content.decode()
@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from users.mail import enqueue_mail, send_pending
+from users.models import OutgoingEmail
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('Сервер недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14MailOutbox:
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_ASYNC = True
+        response = client.post('/api/v1/auth/signup/', data={
+            'email': 'user@yamdb.fake', 'username': 'user'
+        })
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при регистрации письмо не отправляется '
+            'в процессе запроса, а ставится в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipients='user@yamdb.fake', sent__isnull=True
+        ).exists()
+
+        stdout = StringIO()
+        call_command('mail_worker', '--once', stdout=stdout)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `mail_worker` отправляет письма из очереди.'
+        )
+        assert mail.outbox[0].to == ['user@yamdb.fake']
+        assert not OutgoingEmail.objects.filter(sent__isnull=True).exists()
+
+        call_command('mail_worker', '--once', stdout=stdout)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_02_retry_with_backoff(self, settings):
+        settings.EMAIL_OUTBOX_ASYNC = True
+        email = enqueue_mail('Тема', 'Текст', 'auth@yamdb.fake',
+                             ['user@yamdb.fake'])
+        assert send_pending(connection=FailingBackend()) == (0, 1)
+        email.refresh_from_db()
+        assert email.sent is None and email.attempts == 1
+        assert email.last_error
+        assert email.next_attempt > timezone.now(), (
+            'Проверьте, что после ошибки письмо откладывается.'
+        )
+        assert send_pending() == (0, 0)
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        assert send_pending() == (1, 1)
+        assert len(mail.outbox) == 1
+
+    def test_03_max_attempts(self, settings):
+        settings.EMAIL_OUTBOX_ASYNC = True
+        enqueue_mail('Тема', 'Текст', 'auth@yamdb.fake', ['user@yamdb.fake'])
+        for _ in range(2):
+            send_pending(max_attempts=2, connection=FailingBackend())
+            OutgoingEmail.objects.update(
+                next_attempt=timezone.now() - timedelta(seconds=1)
+            )
+        assert send_pending(max_attempts=2) == (0, 0), (
+            'Проверьте, что после исчерпания попыток письмо не отправляется.'
+        )
+        assert len(mail.outbox) == 0
@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from users.authentication import UserCache
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15UserCache:
+
+    def test_01_warm_cache_skips_user_query(self, user_client,
+                                            django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'TestUser', (
+            'Проверьте, что при повторном запросе пользователь берётся '
+            'из кэша аутентификации без обращения к базе данных.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client,
+                                              user_client):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        admin_client.patch('/api/v1/users/TestUser/', data={'role': 'admin'})
+        assert user_client.get('/api/v1/users/').status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения роли пользователя запись '
+            'в кэше аутентификации сбрасывается.'
+        )
+
+        admin_client.delete('/api/v1/users/TestUser/')
+        assert user_client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что удалённый пользователь не остаётся в кэше.'
+
+    def test_03_lru_and_ttl(self, monkeypatch):
+        now = [0]
+        monkeypatch.setattr(
+            'users.authentication.time.monotonic', lambda: now[0]
+        )
+        cache = UserCache(maxsize=2, ttl=10)
+        cache.set(1, 'first')
+        cache.set(2, 'second')
+        assert cache.get(1) == 'first'
+        cache.set(3, 'third')
+        assert cache.get(2) is None, (
+            'Проверьте, что при переполнении вытесняется давно не '
+            'использованная запись.'
+        )
+        assert cache.get(1) == 'first'
+        now[0] = 11
+        assert cache.get(1) is None, (
+            'Проверьте, что записи старше ttl не возвращаются.'
+        )
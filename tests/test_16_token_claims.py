@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users.authentication import issue_access_token, revoke_tokens
+
+
+def claims_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {issue_access_token(user)}'
+    )
+    return client
+
+
+@pytest.fixture
+def role_claims(settings):
+    settings.JWT_ROLE_CLAIMS = True
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TokenClaims:
+
+    def test_01_permissions_from_claims(self, role_claims, admin):
+        client = claims_client(admin)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post('/api/v1/categories/', data={
+                'name': 'Фильм', 'slug': 'films'
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        assert not [
+            query for query in queries.captured_queries
+            if 'users_user' in query['sql']
+        ], (
+            'Проверьте, что при токене с ролью права администратора '
+            'проверяются без чтения пользователя из базы данных.'
+        )
+
+    def test_02_author_from_claims(self, role_claims, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что полные данные пользователя загружаются '
+            'при обращении к полям, которых нет в токене.'
+        )
+
+    def test_03_revoked_token(self, role_claims, user):
+        client = claims_client(user)
+        assert client.get('/api/v1/users/me/').status_code == HTTPStatus.OK
+        revoke_tokens(user)
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что увеличение token_version отзывает токены.'
+        user.refresh_from_db()
+        assert claims_client(user).get('/api/v1/users/me/').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_04_role_change_revokes_token(self, role_claims, admin,
+                                          admin_client):
+        client = claims_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        admin.role = 'user'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что смена роли отзывает токены со старой ролью.'
+
+    def test_05_save_without_extra_query(self, user_client, user):
+        user = type(user).objects.get(pk=user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            user.bio = 'Новая биография'
+            user.save()
+        assert len(queries) == 1, (
+            'Проверьте, что сохранение пользователя без смены роли не '
+            'перечитывает его строку из базы данных.'
+        )
+        version = user.token_version
+        user.role = 'moderator'
+        user.save()
+        user.refresh_from_db()
+        assert user.token_version == version + 1
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Ещё биография'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.token_version == version + 1, (
+            'Проверьте, что изменение профиля без смены роли не отзывает '
+            'токены.'
+        )
@@ -0,0 +1,102 @@
+import pytest
+from reviews.models import Category, Title
+from reviews import search
+
+
+@pytest.fixture
+def titles(category):
+    books = Category.objects.create(name='Книга', slug='books')
+    return [
+        Title.objects.create(
+            name='Властелин колец', year=2001, category=category,
+            description='Экранизация романа о кольце всевластья'
+        ),
+        Title.objects.create(
+            name='Властелин колец', year=1954, category=books,
+            description='Роман'
+        ),
+        Title.objects.create(
+            name='Кольцо кольцо кольцо', year=2002, category=category,
+            description='Ужасы'
+        ),
+        Title.objects.create(
+            name='Матрица', year=1999, category=category,
+            description='Фантастика о симуляции'
+        ),
+    ]
+
+
+def names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleSearch:
+
+    def test_01_search_name_and_description(self, client, titles):
+        response = client.get('/api/v1/titles/?search=симуляции')
+        assert names(response) == ['Матрица'], (
+            'Проверьте, что `?search=` ищет по описанию произведения.'
+        )
+        response = client.get('/api/v1/titles/?search=властелин')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что `?search=` ищет по названию без учёта регистра.'
+        )
+        response = client.get(
+            '/api/v1/titles/?search=властелин&category=films'
+        )
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0].id
+        ], 'Проверьте, что поиск сочетается с фильтрами.'
+
+    def test_02_search_ranked(self, client, titles):
+        response = client.get('/api/v1/titles/?search=кольц')
+        assert names(response)[0] == 'Кольцо кольцо кольцо', (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        response = client.get('/api/v1/titles/?search=кольц&ordering=-year')
+        assert [title['year'] for title in response.json()['results']] == (
+            [2002, 2001]
+        ), 'Проверьте, что явная сортировка важнее релевантности.'
+
+        pages = []
+        data = client.get(
+            '/api/v1/titles/', {'search': 'кольц', 'cursor': '', 'limit': 1}
+        ).json()
+        while True:
+            pages.extend(title['name'] for title in data['results'])
+            if not data['next']:
+                break
+            data = client.get(data['next']).json()
+        assert pages == names(client.get('/api/v1/titles/?search=кольц')), (
+            'Проверьте, что курсорная пагинация работает с поиском.'
+        )
+
+    def test_03_index_follows_changes(self, client, titles):
+        title = titles[3]
+        title.name = 'Бегущий по лезвию'
+        title.save()
+        assert names(client.get('/api/v1/titles/?search=бегущий')) == [
+            'Бегущий по лезвию'
+        ], 'Проверьте, что индекс поиска обновляется при изменении.'
+        assert client.get('/api/v1/titles/?search=матрица').json()[
+            'count'
+        ] == 0
+        title.delete()
+        assert client.get('/api/v1/titles/?search=бегущий').json()[
+            'count'
+        ] == 0
+
+    def test_04_fallback_without_fts(self, client, titles, monkeypatch):
+        monkeypatch.setattr(
+            search, '_fts_tables', {('default', search.FTS_TABLE): False}
+        )
+        response = client.get('/api/v1/titles/?search=симуляции')
+        assert names(response) == ['Матрица'], (
+            'Проверьте, что без FTS5 поиск выполняется через icontains.'
+        )
+
+    def test_05_fts_syntax_is_escaped(self, client, titles):
+        response = client.get('/api/v1/titles/?search=" OR NEAR(')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0
@@ -0,0 +1,75 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import User
+
+
+@pytest.fixture
+def users():
+    User.objects.bulk_create(
+        User(username=username, email=f'{username}@yamdb.fake')
+        for username in ('Alexander', 'alex', 'Sasha', 'Oleksandr', 'Bob')
+    )
+
+
+def usernames(response):
+    return sorted(user['username'] for user in response.json()['results'])
+
+
+def search_query_plan(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    sql = [
+        query['sql'] for query in queries.captured_queries
+        if 'FROM "users_user"' in query['sql'] and 'LIMIT' in query['sql']
+    ][-1]
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18UserSearch:
+
+    def test_01_substring_search(self, admin_client, users):
+        response = admin_client.get('/api/v1/users/?search=ALEX')
+        assert usernames(response) == ['Alexander', 'alex'], (
+            'Проверьте, что поиск пользователей по подстроке логина '
+            'не учитывает регистр.'
+        )
+        assert usernames(admin_client.get('/api/v1/users/?search=and')) == (
+            ['Alexander', 'Oleksandr']
+        )
+        plan = search_query_plan(admin_client, '/api/v1/users/?search=and')
+        assert 'users_user_trigram VIRTUAL TABLE' in plan, (
+            'Проверьте, что поиск по подстроке использует триграммный индекс.'
+        )
+
+    def test_02_prefix_search(self, admin_client, users):
+        url = '/api/v1/users/?search=Al&search_mode=prefix'
+        assert usernames(admin_client.get(url)) == ['Alexander'], (
+            'Проверьте, что `search_mode=prefix` ищет логины по префиксу.'
+        )
+        plan = search_query_plan(admin_client, url)
+        assert 'USING INDEX' in plan and 'username' in plan, (
+            'Проверьте, что поиск по префиксу использует индекс логина.'
+        )
+
+    def test_03_index_follows_changes(self, admin_client, users):
+        admin_client.patch('/api/v1/users/Bob/', data={'username': 'Robert'})
+        assert usernames(admin_client.get('/api/v1/users/?search=obe')) == (
+            ['Robert']
+        ), 'Проверьте, что индекс поиска обновляется при смене логина.'
+        admin_client.delete('/api/v1/users/Robert/')
+        assert usernames(admin_client.get('/api/v1/users/?search=obe')) == []
+
+    def test_04_short_substring_search(self, admin_client, users):
+        assert usernames(admin_client.get('/api/v1/users/?search=ob')) == (
+            ['Bob']
+        )
+        assert usernames(admin_client.get('/api/v1/users/?search=aL')) == (
+            ['Alexander', 'alex']
+        ), (
+            'Проверьте, что строка поиска короче трёх символов ищется как '
+            'подстрока без учёта регистра, а не как префикс.'
+        )
@@ -0,0 +1,32 @@
+import pytest
+
+from tests.utils import list_query_plan
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleFilterPlan:
+
+    @pytest.mark.parametrize('url,expected_count,expected_search', (
+        ('/api/v1/titles/?category=FILMS', 100,
+         'reviews_title USING INDEX'),
+        ('/api/v1/titles/?genre=drama', 100,
+         'USING COVERING INDEX reviews_genre_normalized_slug'),
+        ('/api/v1/titles/?name=ПРОИЗВЕДЕНИЕ 7', 1,
+         'reviews_title USING INDEX reviews_title_normalized_name'),
+        ('/api/v1/titles/?year=1995', 10,
+         'reviews_title USING INDEX title_year_idx'),
+    ))
+    def test_01_filters_use_indexes(self, client, catalogue, url,
+                                    expected_count, expected_search):
+        response, plan = list_query_plan(client, url)
+        assert response.json()['count'] == expected_count, (
+            f'Проверьте, что фильтр `{url}` не учитывает регистр.'
+        )
+        assert any(
+            step.startswith('SEARCH') and expected_search in step
+            for step in plan
+        ), f'Проверьте, что фильтр `{url}` использует индекс: {plan}'
+        assert not any(step.startswith('SCAN') for step in plan), (
+            f'Проверьте, что фильтр `{url}` не просматривает таблицу '
+            f'целиком: {plan}'
+        )
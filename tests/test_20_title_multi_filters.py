@@ -0,0 +1,55 @@
+import pytest
+from reviews.models import Genre, Title
+
+from tests.utils import list_query_plan
+
+
+def ids(response):
+    return [title['id'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleMultiFilters:
+
+    def test_01_multi_value_filters(self, client, catalogue):
+        drama, comedy = Genre.objects.order_by('id')
+        through = Title.genre.through
+        through.objects.bulk_create(
+            through(title_id=title_id,
+                    genre_id=(comedy, drama)[title_id % 2].id)
+            for title_id in Title.objects.values_list('id', flat=True)[:10]
+        )
+        response = client.get('/api/v1/titles/?genre=Drama,comedy&limit=500')
+        assert len(ids(response)) == len(set(ids(response))) == 200, (
+            'Проверьте, что фильтр по нескольким жанрам не дублирует '
+            'произведения с несколькими жанрами.'
+        )
+        response = client.get('/api/v1/titles/?category=films,books')
+        assert response.json()['count'] == 200, (
+            'Проверьте, что `?category=` принимает несколько значений.'
+        )
+
+    def test_02_year_range(self, client, catalogue):
+        response = client.get(
+            '/api/v1/titles/?year_min=1995&year_max=1999&limit=500'
+        )
+        years = {title['year'] for title in response.json()['results']}
+        assert years == set(range(1995, 2000)), (
+            'Проверьте, что `year_min` и `year_max` задают диапазон лет.'
+        )
+
+    @pytest.mark.parametrize('url,expected_search', (
+        ('/api/v1/titles/?genre=drama,comedy',
+         'USING COVERING INDEX title_genre_genre_title_idx'),
+        ('/api/v1/titles/?category=films&year_min=1995&year_max=1999',
+         'reviews_title USING INDEX title_category_year_idx'),
+    ))
+    def test_03_filters_use_indexes(self, client, catalogue,
+                                    url, expected_search):
+        _, plan = list_query_plan(client, url)
+        assert any(expected_search in step for step in plan), (
+            f'Проверьте, что фильтр `{url}` использует индекс: {plan}'
+        )
+        assert not any(
+            step.startswith('SCAN') or 'DISTINCT' in step for step in plan
+        ), f'Проверьте, что фильтр `{url}` обходится без полного просмотра.'
@@ -0,0 +1,72 @@
+import pytest
+from reviews.models import Title
+
+from tests.utils import list_query_plan
+
+ORDERING_INDEXES = {
+    '-rating': ('title_rating_idx', 'title_category_rating_idx'),
+    'year': ('title_year_idx', 'title_category_year_idx'),
+    'name': ('name_idx', 'title_category_name_idx'),
+    '-reviews_count': ('title_reviews_count_idx', 'title_category_count_idx'),
+}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TitleOrdering:
+
+    def test_01_ordering_values(self, client, catalogue):
+        for idx, title in enumerate(Title.objects.order_by('id')[:5]):
+            title.rating = idx + 1
+            title.reviews_count = 10 - idx
+            title.save()
+        response = client.get('/api/v1/titles/?ordering=-rating&limit=6')
+        ratings = [title['rating'] for title in response.json()['results']]
+        assert ratings == [5, 4, 3, 2, 1, None], (
+            'Проверьте, что `?ordering=-rating` ставит произведения '
+            'без оценок в конец.'
+        )
+        response = client.get('/api/v1/titles/?ordering=-reviews_count')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids[:5] == list(
+            Title.objects.order_by('id').values_list('id', flat=True)[:5]
+        ), 'Проверьте сортировку `?ordering=-reviews_count`.'
+
+    @pytest.mark.parametrize('ordering', ORDERING_INDEXES)
+    @pytest.mark.parametrize('extra', ('', '&cursor='))
+    def test_02_ordering_uses_index(self, client, catalogue,
+                                    ordering, extra):
+        _, plan = list_query_plan(
+            client, f'/api/v1/titles/?ordering={ordering}&limit=10{extra}'
+        )
+        index = ORDERING_INDEXES[ordering][0]
+        assert f'SCAN reviews_title USING INDEX {index}' in plan, (
+            f'Проверьте, что `?ordering={ordering}` читает записи '
+            f'по индексу {index}: {plan}'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            f'Проверьте, что `?ordering={ordering}` не сортирует '
+            f'весь каталог: {plan}'
+        )
+
+    @pytest.mark.parametrize('ordering', ORDERING_INDEXES)
+    def test_03_ordering_in_category(self, client, catalogue,
+                                     ordering):
+        _, plan = list_query_plan(
+            client, f'/api/v1/titles/?ordering={ordering}&category=films'
+        )
+        index = ORDERING_INDEXES[ordering][1]
+        assert any(
+            step.startswith(f'SEARCH reviews_title USING INDEX {index}')
+            for step in plan
+        ), (
+            f'Проверьте, что `?ordering={ordering}` в категории читает '
+            f'записи по индексу {index}: {plan}'
+        )
+        assert not any('TEMP B-TREE' in step for step in plan)
+
+    def test_04_unknown_category(self, client, catalogue):
+        response = client.get('/api/v1/titles/?category=nope&ordering=year')
+        assert response.json()['results'] == [], (
+            'Проверьте, что фильтр по неизвестной категории возвращает '
+            'пустой список.'
+        )
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import (Category, CategoryLeaderboard, Genre,
+                            GenreLeaderboard, Title)
+
+
+@pytest.fixture
+def titles(admin_client):
+    for slug in ('films', 'books'):
+        admin_client.post('/api/v1/categories/', data={
+            'name': slug, 'slug': slug
+        })
+    for slug in ('drama', 'comedy'):
+        admin_client.post('/api/v1/genres/', data={'name': slug, 'slug': slug})
+    for idx, (category, genres) in enumerate((
+        ('films', ['drama']),
+        ('films', ['drama', 'comedy']),
+        ('books', ['comedy']),
+        ('films', ['comedy']),
+    )):
+        admin_client.post('/api/v1/titles/', data={
+            'name': f'Произведение {idx}', 'year': 2000,
+            'category': category, 'genre': genres
+        })
+    return list(Title.objects.order_by('id'))
+
+
+def review(client, title, score):
+    return client.post(
+        f'/api/v1/titles/{title.id}/reviews/',
+        data={'text': 'Отзыв', 'score': score}
+    )
+
+
+def top(client, query=''):
+    response = client.get(f'/api/v1/titles/top/{query}')
+    assert response.status_code == HTTPStatus.OK
+    return [title['name'] for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22TitleTop:
+
+    def test_01_top_by_category_and_genre(self, client, admin_client,
+                                          user_client, titles):
+        for title, score in zip(titles, (6, 9, 10, 3)):
+            review(admin_client, title, score)
+        review(user_client, titles[1], 5)
+
+        assert top(client, '?category=films') == [
+            'Произведение 1', 'Произведение 0', 'Произведение 3'
+        ], (
+            'Проверьте, что `/api/v1/titles/top/?category=` возвращает '
+            'произведения категории по убыванию рейтинга.'
+        )
+        assert top(client, '?genre=comedy&limit=2') == [
+            'Произведение 2', 'Произведение 1'
+        ], 'Проверьте, что `?genre=` и `?limit=` учитываются.'
+        assert all(
+            len(top(client, f'?category=films&limit={limit}')) == 3
+            for limit in ('0', '-1', 'много')
+        ), (
+            'Проверьте, что неверный `?limit=` заменяется значением '
+            'по умолчанию.'
+        )
+        assert top(client)[0] == 'Произведение 2'
+        assert client.get(
+            '/api/v1/titles/top/?category=films&genre=drama'
+        ).status_code == HTTPStatus.BAD_REQUEST
+        assert client.get(
+            '/api/v1/titles/top/?genre=unknown'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_leaderboard_follows_changes(self, client, admin_client,
+                                            titles):
+        review(admin_client, titles[0], 2)
+        review(admin_client, titles[1], 4)
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0].id}/',
+            data={'category': 'books', 'genre': ['comedy']}
+        )
+        assert top(client, '?category=books') == [
+            'Произведение 0', 'Произведение 2'
+        ], 'Проверьте, что таблица лидеров следует за сменой категории.'
+        assert top(client, '?genre=drama') == ['Произведение 1'], (
+            'Проверьте, что таблица лидеров следует за сменой жанров.'
+        )
+        review_id = titles[1].reviews.get().id
+        admin_client.delete(
+            f'/api/v1/titles/{titles[1].id}/reviews/{review_id}/'
+        )
+        assert top(client, '?genre=comedy')[0] == 'Произведение 0', (
+            'Проверьте, что удаление отзыва обновляет таблицу лидеров.'
+        )
+
+    def test_03_rebuild_command(self, client, admin_client, titles,
+                                django_assert_max_num_queries):
+        review(admin_client, titles[3], 8)
+        expected = {
+            model: sorted(model.objects.values_list(
+                'title_id', 'rating', 'reviews_count'
+            ))
+            for model in (CategoryLeaderboard, GenreLeaderboard)
+        }
+        CategoryLeaderboard.objects.all().delete()
+        GenreLeaderboard.objects.update(rating=None)
+        call_command('rebuild_leaderboards', stdout=StringIO())
+        for model, rows in expected.items():
+            assert sorted(model.objects.values_list(
+                'title_id', 'rating', 'reviews_count'
+            )) == rows, (
+                'Проверьте, что `rebuild_leaderboards` восстанавливает '
+                'таблицы лидеров.'
+            )
+        assert Category.objects.count() == 2 and Genre.objects.count() == 2
+        with django_assert_max_num_queries(4):
+            top(client, '?genre=comedy')
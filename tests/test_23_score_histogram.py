@@ -0,0 +1,91 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+from tests.utils import create_reviews, create_single_review
+
+
+def histogram(client, title_id):
+    response = client.get(f'/api/v1/titles/{title_id}/')
+    return {
+        int(score): count
+        for score, count in response.json()['histogram'].items()
+        if count
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ScoreHistogram:
+
+    def test_01_histogram_follows_review_changes(self, admin_client, admin,
+                                                 user, user_client, client):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отлично', 10)
+        assert histogram(client, title_id) == {5: 1, 10: 1}, (
+            'Проверьте, что при создании отзыва его оценка попадает в '
+            'гистограмму произведения.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        assert histogram(client, title_id) == {10: 2}, (
+            'Проверьте, что при изменении оценки отзыва она переносится в '
+            'другой столбец гистограммы.'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'text': 'Без изменения оценки'}
+        )
+        assert histogram(client, title_id) == {10: 2}
+
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert histogram(client, title_id) == {10: 1}, (
+            'Проверьте, что при удалении отзыва его оценка вычитается из '
+            'гистограммы.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['histogram'] == {
+            str(score): 0 for score in range(1, 11)
+        }, (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из гистограмм произведений.'
+        )
+
+    def test_02_histogram_read_without_aggregation(self, admin_client, admin,
+                                                   client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['histogram']['5'] == 1
+        assert not any(
+            'reviews_review' in query['sql'] for query in context
+        ), (
+            'Проверьте, что гистограмма читается из полей произведения '
+            'без обращения к таблице отзывов.'
+        )
+
+    def test_03_rebuild_ratings_repairs_histogram(self, admin_client, admin,
+                                                  client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(score_5_count=0, score_1_count=3)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+        call_command('rebuild_ratings', stdout=StringIO())
+        assert histogram(client, titles[0]['id']) == {5: 1}, (
+            'Проверьте, что команда `rebuild_ratings` восстанавливает '
+            'гистограммы оценок.'
+        )
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
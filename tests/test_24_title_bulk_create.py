@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import CategoryLeaderboard, GenreLeaderboard, Title
+
+URL = '/api/v1/titles/bulk/'
+
+
+@pytest.fixture
+def slugs(admin_client):
+    for slug in ('films', 'books'):
+        admin_client.post('/api/v1/categories/', data={
+            'name': slug, 'slug': slug
+        })
+    for slug in ('drama', 'comedy', 'horror'):
+        admin_client.post('/api/v1/genres/', data={'name': slug, 'slug': slug})
+
+
+def titles_data(count):
+    return [
+        {
+            'name': f'Произведение {idx}', 'year': 1980 + idx,
+            'category': ('films', 'books')[idx % 2],
+            'genre': ['drama', 'comedy', 'horror'][:idx % 3 + 1],
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleBulkCreate:
+
+    def test_01_bulk_create(self, admin_client, slugs, client):
+        response = admin_client.post(URL, data=titles_data(3), format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос администратора к `/api/v1/titles/'
+            'bulk/` со списком произведений возвращает статус 201.'
+        )
+        created = response.json()
+        assert [title['name'] for title in created] == [
+            'Произведение 0', 'Произведение 1', 'Произведение 2'
+        ]
+        assert [
+            sorted(genre['slug'] for genre in title['genre'])
+            for title in created
+        ] == [['drama'], ['comedy', 'drama'], ['comedy', 'drama', 'horror']]
+
+        detail = client.get(f'/api/v1/titles/{created[1]["id"]}/').json()
+        assert detail['category']['slug'] == 'books', (
+            'Проверьте, что ответ содержит id сохранённых произведений.'
+        )
+        assert CategoryLeaderboard.objects.count() == 3
+        assert GenreLeaderboard.objects.count() == 6, (
+            'Проверьте, что массовое создание заполняет таблицы лидеров.'
+        )
+        response = client.get('/api/v1/titles/', {'name': 'произведение 2'})
+        assert response.json()['count'] == 1
+
+    def test_02_bulk_create_query_count(self, admin_client, slugs):
+        queries = []
+        for count in (2, 30):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    URL, data=titles_data(count), format='json'
+                )
+            assert response.status_code == HTTPStatus.CREATED
+            queries.append(len(context))
+        assert queries[0] == queries[1], (
+            'Проверьте, что число запросов при массовом создании не '
+            'зависит от количества произведений.'
+        )
+
+    def test_03_bulk_create_errors_per_item(self, admin_client, slugs):
+        data = titles_data(3)
+        data[0]['genre'] = ['drama', 'unknown']
+        data[2]['category'] = 'missing'
+        del data[2]['name']
+        response = admin_client.post(URL, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[1] == {}, (
+            'Проверьте, что ошибки массового создания возвращаются списком '
+            'по элементам запроса.'
+        )
+        assert set(errors[0]) == {'genre'}
+        assert set(errors[2]) == {'name', 'category'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в одном элементе ничего не '
+            'сохраняется.'
+        )
+
+    def test_04_bulk_create_requires_admin(self, user_client, slugs):
+        response = user_client.post(URL, data=titles_data(1), format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert not Title.objects.exists()
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+GENRES = ('drama', 'comedy', 'horror', 'western', 'fantasy')
+
+
+@pytest.fixture
+def slugs(admin_client):
+    admin_client.post('/api/v1/categories/', data={
+        'name': 'films', 'slug': 'films'
+    })
+    for slug in GENRES:
+        admin_client.post('/api/v1/genres/', data={'name': slug, 'slug': slug})
+
+
+def create_title(client, genres):
+    return client.post('/api/v1/titles/', data={
+        'name': 'Произведение', 'year': 2000, 'category': 'films',
+        'genre': list(genres)
+    }, format='json')
+
+
+def count_queries(request, *args, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = request(*args, **kwargs)
+    assert response.status_code in (HTTPStatus.CREATED, HTTPStatus.OK)
+    return len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleWriteQueries:
+
+    def test_01_post_query_count(self, admin_client, slugs):
+        counts = [
+            count_queries(create_title, admin_client, GENRES[:size])
+            for size in (1, len(GENRES))
+        ]
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при POST-запросе к '
+            '`/api/v1/titles/` не зависит от количества жанров.'
+        )
+
+    def test_02_patch_query_count(self, admin_client, slugs):
+        counts = []
+        for size in (1, len(GENRES)):
+            title_id = create_title(admin_client, ()).json()['id']
+            counts.append(count_queries(
+                admin_client.patch, f'/api/v1/titles/{title_id}/',
+                data={'genre': list(GENRES[:size])}, format='json'
+            ))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов при PATCH-запросе к '
+            '`/api/v1/titles/{title_id}/` не зависит от количества жанров.'
+        )
+
+    def test_03_unknown_genres_in_one_error(self, admin_client, slugs):
+        response = create_title(admin_client, ('drama', 'missing', 'absent'))
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['genre']
+        assert len(errors) == 1 and all(
+            slug in errors[0] for slug in ('missing', 'absent')
+        ), (
+            'Проверьте, что обо всех неизвестных жанрах сообщается одной '
+            'ошибкой.'
+        )
@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comments, Review
+from users.models import User
+
+AUTHORS_COUNT = 20
+
+
+@pytest.fixture
+def authored_review(title):
+    """Отзыв и комментарии к нему от AUTHORS_COUNT разных авторов."""
+    User.objects.bulk_create(
+        User(username=f'author{idx}', email=f'author{idx}@yamdb.fake')
+        for idx in range(AUTHORS_COUNT)
+    )
+    authors = list(User.objects.order_by('id'))
+    Review.objects.bulk_create(
+        Review(author=author, title=title, text='Отзыв', score=5)
+        for author in authors
+    )
+    review = Review.objects.order_by('id').first()
+    Comments.objects.bulk_create(
+        Comments(author=author, review=review, text='Комментарий')
+        for author in authors
+    )
+    return review
+
+
+def count_queries(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    results = response.json()['results']
+    assert len(results) == params['limit']
+    assert all(item['author'].startswith('author') for item in results)
+    return len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ReviewCommentQueries:
+
+    @pytest.mark.parametrize('pagination', ({}, {'cursor': ''}))
+    def test_01_review_list_query_count(self, client, authored_review,
+                                        pagination):
+        url = f'/api/v1/titles/{authored_review.title_id}/reviews/'
+        counts = [
+            count_queries(client, url, dict(pagination, limit=limit))
+            for limit in (1, AUTHORS_COUNT)
+        ]
+        assert counts[0] == counts[1], (
+            'Проверьте, что авторы отзывов загружаются тем же запросом, '
+            'что и отзывы: число запросов не должно зависеть от размера '
+            'страницы.'
+        )
+
+    @pytest.mark.parametrize('pagination', ({}, {'cursor': ''}))
+    def test_02_comment_list_query_count(self, client, authored_review,
+                                         pagination):
+        url = (
+            f'/api/v1/titles/{authored_review.title_id}/reviews/'
+            f'{authored_review.id}/comments/'
+        )
+        counts = [
+            count_queries(client, url, dict(pagination, limit=limit))
+            for limit in (1, AUTHORS_COUNT)
+        ]
+        assert counts[0] == counts[1], (
+            'Проверьте, что авторы комментариев загружаются тем же '
+            'запросом, что и комментарии: число запросов не должно '
+            'зависеть от размера страницы.'
+        )
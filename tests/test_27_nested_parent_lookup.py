@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def parent_selects(context, table):
+    return [
+        query['sql'] for query in context
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('comment')
+class Test27NestedParentLookup:
+
+    def test_01_review_list_queries(self, client, review,
+                                    django_assert_num_queries):
+        # Произведение для ETag и проверки, количество и страница.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/'
+            )
+        assert response.json()['count'] == 1
+
+    def test_02_comment_list_queries(self, client, review,
+                                     django_assert_num_queries):
+        # Отзыв для ETag и проверки, количество и страница.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                '/comments/'
+            )
+        assert response.json()['count'] == 1
+
+    def test_03_missing_parent(self, client, review):
+        responses = (
+            client.get(f'/api/v1/titles/{review.title_id + 1}/reviews/'),
+            client.get(
+                f'/api/v1/titles/{review.title_id + 1}/reviews/{review.id}'
+                '/comments/'
+            ),
+        )
+        assert all(
+            response.status_code == HTTPStatus.NOT_FOUND
+            for response in responses
+        ), (
+            'Проверьте, что для несуществующего родительского объекта '
+            'вложенный маршрут возвращает статус 404.'
+        )
+
+    def test_04_single_parent_lookup_on_create(self, user_client, review):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/',
+                data={'text': 'Ещё отзыв', 'score': 7}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(parent_selects(context, 'reviews_title')) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'один раз.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+                '/comments/',
+                data={'text': 'Ещё комментарий'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(parent_selects(context, 'reviews_review')) == 1, (
+            'Проверьте, что при создании комментария отзыв загружается '
+            'один раз.'
+        )
@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review
+
+
+def exists_queries(context):
+    return [
+        query['sql'] for query in context
+        if 'SELECT (1) AS "a" FROM "reviews_review"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28DuplicateReview:
+
+    def test_01_duplicate_review_rejected(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Раз', 'score': 4})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not exists_queries(context), (
+            'Проверьте, что при создании отзыва повтор не проверяется '
+            'отдельным запросом: его ловит ограничение базы.'
+        )
+
+        response = user_client.post(url, data={'text': 'Два', 'score': 9})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на то же произведение '
+            'возвращает статус 400, а не ошибку сервера.'
+        )
+        assert 'non_field_errors' in response.json()
+        title.refresh_from_db()
+        assert (title.score_sum, title.reviews_count, title.score_9_count) == (
+            4, 1, 0
+        ), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг '
+            'произведения.'
+        )
+        assert Review.objects.count() == 1
+
+    def test_02_patch_without_duplicate_check(self, user_client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        review_id = user_client.post(
+            url, data={'text': 'Раз', 'score': 4}
+        ).json()['id']
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{url}{review_id}/', data={'score': 6}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not exists_queries(context), (
+            'Проверьте, что при изменении отзыва не выполняется проверка '
+            'на повтор.'
+        )
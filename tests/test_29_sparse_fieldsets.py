@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Genre, Review, Title
+
+TITLES_COUNT = 5
+
+
+@pytest.fixture
+def titles(admin, category):
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category,
+              description='Описание')
+        for idx in range(TITLES_COUNT)
+    )
+    titles = list(Title.objects.order_by('id'))
+    for title in titles:
+        title.genre.add(genre)
+    Review.objects.create(author=admin, title=titles[0], text='Отзыв',
+                          score=5)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29SparseFieldsets:
+
+    def test_01_title_fields(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                '/api/v1/titles/', {'fields': 'id,name,rating'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == TITLES_COUNT
+        assert all(
+            set(title) == {'id', 'name', 'rating'} for title in results
+        ), (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        sql = ' '.join(query['sql'] for query in context)
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что невыведенные поля и связи не загружаются '
+            'из базы.'
+        )
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что без поля `genre` жанры не подгружаются.'
+        )
+
+    def test_02_title_omit(self, client, titles):
+        response = client.get(
+            f'/api/v1/titles/{titles[0].id}/',
+            {'omit': 'description,histogram,genre'}
+        )
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'category'
+        }, (
+            'Проверьте, что параметр `omit` убирает перечисленные поля.'
+        )
+        assert response.json()['category'] == {
+            'name': 'Фильм', 'slug': 'films'
+        }
+
+    def test_03_unknown_field(self, client, titles):
+        response = client.get('/api/v1/titles/', {'fields': 'id,unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` возвращает '
+            'статус 400.'
+        )
+
+    def test_04_review_fields_with_cursor(self, client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'fields': 'id,score', 'cursor': ''})
+        assert response.json()['results'] == [
+            {'id': Review.objects.get().id, 'score': 5}
+        ]
+        sql = ' '.join(query['sql'] for query in context)
+        assert '"text"' not in sql and 'users_user' not in sql
+        assert len(context) == 2, (
+            'Проверьте, что колонки сортировки загружаются вместе со '
+            'страницей и курсор не требует дополнительных запросов.'
+        )
+
+    def test_05_category_fields_cached_separately(self, client, titles):
+        response = client.get('/api/v1/categories/', {'fields': 'slug'})
+        assert response.json()['results'] == [{'slug': 'films'}]
+        response = client.get('/api/v1/categories/')
+        assert response.json()['results'] == [
+            {'name': 'Фильм', 'slug': 'films'}
+        ], (
+            'Проверьте, что параметры `fields` и `omit` входят в ключ кэша '
+            'списка.'
+        )
+
+    def test_06_users_and_writes(self, admin_client, admin, user_client,
+                                 titles):
+        response = admin_client.get('/api/v1/users/', {'fields': 'username'})
+        assert {'username': admin.username} in response.json()['results']
+        assert all(
+            set(user) == {'username'} for user in response.json()['results']
+        )
+
+        response = user_client.post(
+            f'/api/v1/titles/{titles[1].id}/reviews/?fields=id',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert {'text', 'score'} <= set(response.json()), (
+            'Проверьте, что параметр `fields` не влияет на запись.'
+        )
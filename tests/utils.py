@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +308,17 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def list_query_plan(client, url):
+    """План запроса страницы произведений для GET url."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    sql = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT "reviews_title"."id"')
+    ][0]
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    return response, plan